@@ -0,0 +1,391 @@
+# Copyright (C) 2024 twyleg
+import asyncio
+import json
+import logging
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from alive_progress import alive_bar
+
+from classroom_utils.classes import Classes, Member, User
+from classroom_utils.github_graphql import USER_BATCH_SIZE, UserInfo, batched, build_users_query, \
+    parse_users_response
+from classroom_utils.github_operations import GithubCredentials, GithubOperations, MemberFailure, RequestThrottle, \
+    log_failure_summary
+from classroom_utils.github_retry import RetryPolicy
+from classroom_utils.github_scheduler import RateLimitScheduler
+from classroom_utils.github_session import GithubSession
+from classroom_utils.repo_matching import PersonalRepoMatcher
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # type: ignore[assignment]
+
+
+logm = logging.getLogger("async_github_operations")
+
+
+class AsyncBackendNotAvailableError(Exception):
+    pass
+
+
+class AsyncGithubRequestError(Exception):
+
+    def __init__(self, verb: str, url: str, status: int, message: str):
+        super().__init__(f"{verb} {url} failed with status {status}: {message}")
+        self.status = status
+
+
+class AsyncGithubOperations:
+
+    DEFAULT_CONCURRENCY = 20
+
+    def __init__(self, classes: Classes, github_credentials: GithubCredentials,
+                 concurrency: int = DEFAULT_CONCURRENCY, api_url: str = GithubSession.API_URL):
+        if aiohttp is None:
+            raise AsyncBackendNotAvailableError("The async backend requires aiohttp. "
+                                                "Install it with 'pip install classroom-utils[async]'.")
+        self.classes = classes
+        self.github_credentials = github_credentials
+        self.concurrency = max(1, concurrency)
+        self.api_url = api_url.rstrip("/")
+        self.content_creation_throttle = RequestThrottle(60.0 / GithubOperations.CONTENT_CREATION_REQUESTS_PER_MINUTE)
+        self.scheduler = RateLimitScheduler(self.concurrency)
+        self.retry_policy = RetryPolicy()
+        self._active = 0
+        self._slot_released = asyncio.Condition()
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._org_repos: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    async def __aenter__(self) -> "AsyncGithubOperations":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            headers={
+                "Accept": "application/vnd.github+json",
+                "Authorization": f"Bearer {self.github_credentials.token}",
+                "X-GitHub-Api-Version": GithubSession.API_VERSION,
+            },
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.session.close()
+        self._session = None
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        if self._session is None:
+            raise RuntimeError("AsyncGithubOperations must be entered with 'async with' before sending requests")
+        return self._session
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        # Same as RateLimitScheduler.slot(), but without blocking the event loop. The allowed concurrency is halved on
+        # throttling and recovers with successful requests.
+        async with self._slot_released:
+            await self._slot_released.wait_for(lambda: self._active < self.scheduler.concurrency)
+            self._active += 1
+        try:
+            yield
+        finally:
+            async with self._slot_released:
+                self._active -= 1
+                self._slot_released.notify_all()
+
+    async def _request_with_links(self, verb: str, url: str, params: Optional[Dict[str, Any]] = None,
+                                  body: Any = None, allowed_statuses: Tuple[int, ...] = ()) -> Tuple[int, Any, Any]:
+        if url.startswith("/"):
+            url = f"{self.api_url}{url}"
+
+        rate_limit_retries = 0
+        attempt = 0
+        while True:
+            attempt += 1
+            await asyncio.sleep(self.scheduler.pause_delay())
+            try:
+                async with self._slot():
+                    async with self.session.request(verb, url, params=params, json=body) as response:
+                        text = await response.text()
+                        status, headers, links = response.status, response.headers, response.links
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                request_sent = not isinstance(e, aiohttp.ClientConnectorError)
+                reason = self.retry_policy.retry_reason_for_error(verb, url, request_sent)
+                delay = self.retry_policy.next_delay(attempt, reason) if reason else None
+                if delay is None:
+                    raise
+                logm.debug("Repeating request in %.1fs (%s, attempt %d): %s %s", delay, reason, attempt, verb, url)
+                await asyncio.sleep(delay)
+                continue
+
+            if self.scheduler.update(status, headers, text):
+                if rate_limit_retries >= GithubSession.MAX_RATE_LIMIT_RETRIES:
+                    break
+                rate_limit_retries += 1
+                attempt -= 1
+                logm.debug("Repeating rate limited request (%d/%d): %s %s", rate_limit_retries,
+                           GithubSession.MAX_RATE_LIMIT_RETRIES, verb, url)
+                continue
+
+            reason = self.retry_policy.retry_reason_for_status(verb, url, status)
+            delay = self.retry_policy.next_delay(attempt, reason) if reason else None
+            if delay is None:
+                break
+            logm.debug("Repeating request in %.1fs (%s, attempt %d): %s %s", delay, reason, attempt, verb, url)
+            await asyncio.sleep(delay)
+
+        data = json.loads(text) if text else None
+        if status >= 400 and status not in allowed_statuses:
+            message = data.get("message", "") if isinstance(data, dict) else ""
+            raise AsyncGithubRequestError(verb, url, status, message)
+        return status, data, links
+
+    async def _request(self, verb: str, url: str, params: Optional[Dict[str, Any]] = None, body: Any = None,
+                       allowed_statuses: Tuple[int, ...] = ()) -> Tuple[int, Any]:
+        status, data, _ = await self._request_with_links(verb, url, params, body, allowed_statuses)
+        return status, data
+
+    async def _paginate(self, url: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        items: List[Any] = []
+        next_url: Optional[str] = url
+        next_params: Optional[Dict[str, Any]] = {"per_page": GithubOperations.PER_PAGE, **(params or {})}
+        while next_url:
+            _, data, links = await self._request_with_links("GET", next_url, next_params)
+            items.extend(data)
+            next_link = links.get("next")
+            next_url = str(next_link["url"]) if next_link else None
+            next_params = None
+        return items
+
+    async def _run_for_members(self, title: str, members: List[Member],
+                               operation: Callable[[Member], Awaitable[None]]) -> List[MemberFailure]:
+        failures: List[MemberFailure] = []
+
+        async def run(member: Member) -> None:
+            try:
+                await operation(member)
+            except Exception as e:
+                logm.error("Operation failed for '%s' ('%s'): %s", member.fullname, member.github_username, e)
+                failures.append(MemberFailure(member, e))
+
+        with alive_bar(len(members), title=title, enrich_print=False) as bar:
+            for task in asyncio.as_completed([run(member) for member in members]):
+                await task
+                bar()
+
+        log_failure_summary(failures)
+        return failures
+
+    async def _get_org_repos(self, org_name: str) -> Dict[str, Dict[str, Any]]:
+        if org_name not in self._org_repos:
+            repos = await self._paginate(f"/orgs/{org_name}/repos")
+            self._org_repos[org_name] = {repo["name"].lower(): repo for repo in repos}
+        return self._org_repos[org_name]
+
+    async def _create_content(self, verb: str, url: str, body: Any) -> Any:
+        delay = self.content_creation_throttle.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        _, data = await self._request(verb, url, body=body)
+        return data
+
+    async def _find_invitation_ids(self, full_repo_name: str, github_username: str) -> List[int]:
+        invitations = await self._paginate(f"/repos/{full_repo_name}/invitations")
+        return [invitation["id"] for invitation in invitations
+                if invitation["invitee"]["login"].lower() == github_username.lower()]
+
+    async def _repo_access_grant(self, full_repo_name: str, member: Member, permission: str) -> None:
+        status, _ = await self._request("GET", f"/repos/{full_repo_name}/collaborators/{member.github_username}",
+                                        allowed_statuses=(404,))
+        if status == 204:
+            logm.warning("User already a collaborator of repo '%s' -> '%s'. Nothing todo!", member, full_repo_name)
+            return
+
+        for invitation_id in await self._find_invitation_ids(full_repo_name, member.github_username):
+            logm.warning("Invitation already pending: '%s' -> '%s'. Inviting again!", member, full_repo_name)
+            await self._request("DELETE", f"/repos/{full_repo_name}/invitations/{invitation_id}")
+
+        await self._request("PUT", f"/repos/{full_repo_name}/collaborators/{member.github_username}",
+                            body={"permission": permission})
+        logm.info("Granted access to repo '%s' -> '%s', permission: '%s'", member, full_repo_name, permission)
+
+    async def _repo_access_revoke(self, full_repo_name: str, member: Member) -> None:
+        await self._request("DELETE", f"/repos/{full_repo_name}/collaborators/{member.github_username}")
+        for invitation_id in await self._find_invitation_ids(full_repo_name, member.github_username):
+            await self._request("DELETE", f"/repos/{full_repo_name}/invitations/{invitation_id}")
+        logm.info("Revoked access from repo '%s' for user '%s'", full_repo_name, member)
+
+    async def _get_personal_repo_full_name(self, org_name: str, member: Member) -> str:
+        repos = await self._get_org_repos(org_name)
+        repo = repos.get(member.generate_personal_repo_name().lower())
+        if repo is None:
+            raise AsyncGithubRequestError("GET", f"/orgs/{org_name}/repos", 404,
+                                          f"Repo '{member.generate_personal_repo_name()}' not found")
+        return repo["full_name"]
+
+    async def _get_first_commit_sha(self, full_repo_name: str) -> str:
+        _, data, links = await self._request_with_links("GET", f"/repos/{full_repo_name}/commits", {"per_page": 1})
+        last_link = links.get("last")
+        if last_link:
+            _, data = await self._request("GET", str(last_link["url"]))
+        return data[-1]["sha"]
+
+    async def _review_create(self, org_name: str, member: Member, repo_names: List[str], head_branch_name: str,
+                             review_branch_name: str, pr_title: str) -> None:
+        if not repo_names:
+            logm.warning("Failed to create review for '%s' ('%s')! Unable to find repo in org '%s'",
+                         member.fullname, member.github_username, org_name)
+            return
+        repos = await self._get_org_repos(org_name)
+        full_repo_name = repos[repo_names[0]]["full_name"]
+
+        status, review_branch = await self._request("GET", f"/repos/{full_repo_name}/branches/{review_branch_name}",
+                                                    allowed_statuses=(404,))
+        if status == 404:
+            first_commit_sha = await self._get_first_commit_sha(full_repo_name)
+            await self._create_content("POST", f"/repos/{full_repo_name}/git/refs",
+                                       {"ref": f"refs/heads/{review_branch_name}", "sha": first_commit_sha})
+            review_branch_sha = first_commit_sha
+            logm.info("Created '%s' branch from first commit ('%s')", review_branch_name, first_commit_sha)
+        else:
+            review_branch_sha = review_branch["commit"]["sha"]
+            logm.warning("Branch '%s' already existing in repo '%s'!", review_branch_name, full_repo_name)
+
+        pulls = await self._paginate(f"/repos/{full_repo_name}/pulls", {
+            "state": "open",
+            "base": review_branch_name,
+            "head": f"{org_name}:{head_branch_name}",
+        })
+        if any(pull["title"] == pr_title for pull in pulls):
+            logm.warning("Pull-Request with '%s' already existing in repo '%s'!", review_branch_name, full_repo_name)
+            return
+
+        _, head_branch = await self._request("GET", f"/repos/{full_repo_name}/branches/{head_branch_name}")
+        if head_branch["commit"]["sha"] == review_branch_sha:
+            logm.warning("Unable to create PR! Base branch '%s' and head branch '%s' are equal.",
+                         review_branch_name, head_branch_name)
+            return
+
+        await self._create_content("POST", f"/repos/{full_repo_name}/pulls",
+                                   {"title": pr_title, "base": review_branch_name, "head": head_branch_name})
+        logm.info("Created pullrequest '%s' <- '%s' in repository '%s'", review_branch_name, head_branch_name,
+                  full_repo_name)
+
+    async def resolve_users(self, github_usernames: List[str]) -> Dict[str, UserInfo | None]:
+        async def resolve_batch(batch: Sequence[str]) -> Dict[str, UserInfo | None]:
+            _, response = await self._request("POST", "/graphql", body={"query": build_users_query(batch)})
+            return parse_users_response(batch, response)
+
+        user_infos: Dict[str, UserInfo | None] = {}
+        for batch_user_infos in await asyncio.gather(*[resolve_batch(batch)
+                                                       for batch in batched(github_usernames, USER_BATCH_SIZE)]):
+            user_infos.update(batch_user_infos)
+        return user_infos
+
+    async def class_check(self, class_name: str) -> List[User]:
+        logm.info("Validating class '%s'", class_name)
+
+        class_to_validate = self.classes.get_class(class_name)
+        users: List[User] = [*class_to_validate.moderators, *class_to_validate.members]
+        user_infos = await self.resolve_users([user.github_username for user in users])
+
+        invalid_users: List[User] = []
+        for user in users:
+            user_info = user_infos[user.github_username]
+            if user_info:
+                logm.info("  Valid: %s (id=%d, display_name='%s')", user, user_info.database_id, user_info.name)
+            else:
+                logm.warning("  Invalid: %s", user)
+                invalid_users.append(user)
+        return invalid_users
+
+    async def org_create_personal_repos(self, org_name: str, class_name: str, repo_prefix: str | None,
+                                        template_repo_full_name: str | None) -> List[MemberFailure]:
+        logm.info("Create class repos in org '%s' for class '%s'", org_name, class_name)
+
+        selected_class = self.classes.get_class(class_name)
+        repos = await self._get_org_repos(org_name)
+
+        if template_repo_full_name:
+            _, template_repo = await self._request("GET", f"/repos/{template_repo_full_name}")
+            if not template_repo["is_template"]:
+                raise AsyncGithubRequestError("GET", f"/repos/{template_repo_full_name}", 422,
+                                              "Repo is not a template")
+
+        async def create(member: Member) -> None:
+            repo_name = member.generate_personal_repo_name(repo_prefix)
+            full_repo_name = f"{org_name}/{repo_name}"
+            if repo_name.lower() in repos:
+                logm.warning("Repo already existing: '%s'. Nothing todo!", full_repo_name)
+            elif template_repo_full_name:
+                repo = await self._create_content("POST", f"/repos/{template_repo_full_name}/generate",
+                                                  {"owner": org_name, "name": repo_name, "private": True})
+                repos[repo_name.lower()] = repo
+                logm.info("Created repo '%s' from template '%s'", full_repo_name, template_repo_full_name)
+            else:
+                repo = await self._create_content("POST", f"/orgs/{org_name}/repos",
+                                                  {"name": repo_name, "private": True, "auto_init": True})
+                repos[repo_name.lower()] = repo
+                logm.info("Created repo '%s'", full_repo_name)
+
+        for class_member in selected_class.inactive_members:
+            logm.info("Skipping repo creation of '%s' due to inactivity of class member", class_member.fullname)
+
+        return await self._run_for_members("Creating personal repo:", list(selected_class.active_members), create)
+
+    async def org_reviews_create(self, org_name: str, class_name: str, head_branch_name: str,
+                                 review_branch_name: str) -> List[MemberFailure]:
+        logm.info("Create reviews in '%s' for class '%s'", org_name, class_name)
+
+        selected_class = self.classes.get_class(class_name)
+        active_members = list(selected_class.active_members)
+        repos = await self._get_org_repos(org_name)
+        personal_repo_names = PersonalRepoMatcher(active_members).match_names(repos.keys())
+        return await self._run_for_members(
+            "Creating reviews:",
+            active_members,
+            lambda member: self._review_create(org_name, member, personal_repo_names[member], head_branch_name,
+                                               review_branch_name, "Review")
+        )
+
+    async def org_access_grant_personal_repos(self, org_name: str, selected_class_members: List[Member],
+                                              permission: str) -> List[MemberFailure]:
+        logm.info("Grant access to personal class repos in org '%s' for the following class members:", org_name)
+
+        async def grant(member: Member) -> None:
+            full_repo_name = await self._get_personal_repo_full_name(org_name, member)
+            await self._repo_access_grant(full_repo_name, member, permission)
+
+        await self._get_org_repos(org_name)
+        return await self._run_for_members("Granting access:", selected_class_members, grant)
+
+    async def org_access_revoke_personal_repos(self, org_name: str,
+                                               selected_class_members: List[Member]) -> List[MemberFailure]:
+        logm.info("Revoke access from personal class repos in org '%s' for the following class members:'", org_name)
+
+        async def revoke(member: Member) -> None:
+            full_repo_name = await self._get_personal_repo_full_name(org_name, member)
+            await self._repo_access_revoke(full_repo_name, member)
+
+        await self._get_org_repos(org_name)
+        return await self._run_for_members("Revoke access:", selected_class_members, revoke)
+
+    async def repo_access_grant_for_class(self, full_repo_name: str, selected_class_members: List[Member],
+                                          permission: str) -> List[MemberFailure]:
+        logm.info("Grant class access to repo '%s' with permission '%s' for the following class members:",
+                  full_repo_name, permission)
+        return await self._run_for_members(
+            "Granting access:",
+            selected_class_members,
+            lambda member: self._repo_access_grant(full_repo_name, member, permission)
+        )
+
+    async def repo_access_revoke_for_class(self, full_repo_name: str,
+                                           selected_class_members: List[Member]) -> List[MemberFailure]:
+        logm.info("Revoke class access from repo '%s' for the following class members.", full_repo_name)
+        return await self._run_for_members(
+            "Revoke access:",
+            selected_class_members,
+            lambda member: self._repo_access_revoke(full_repo_name, member)
+        )
@@ -0,0 +1,86 @@
+# Copyright (C) 2024 twyleg
+import logging
+
+from typing import Dict, List, NamedTuple
+
+from classroom_utils.classes import Member
+from classroom_utils.github_graphql import UserInfo
+from classroom_utils.github_inventory import RepoAccessSnapshot
+
+
+logm = logging.getLogger("class_plan")
+
+
+CREATE_REPO = "create repo"
+INVITE = "invite"
+REPLACE_INVITATION = "replace invitation"
+UPDATE_PERMISSION = "update permission"
+REVOKE_ACCESS = "revoke access"
+CANCEL_INVITATION = "cancel invitation"
+
+# Role names reported by GitHub for the permissions accepted when adding collaborators
+ROLE_BY_PERMISSION: Dict[str, str] = {
+    "pull": "read",
+    "triage": "triage",
+    "push": "write",
+    "maintain": "maintain",
+    "admin": "admin",
+}
+
+
+class PlannedChange(NamedTuple):
+    action: str
+    member: Member
+    repo_name: str
+    permission: str | None = None
+    invitation_id: int | None = None
+    # Number of API requests needed to apply the change
+    cost: int = 1
+
+    def __str__(self) -> str:
+        text = f"{self.action}: '{self.repo_name}' ('{self.member.github_username}')"
+        return f"{text}, permission: '{self.permission}'" if self.permission else text
+
+
+def plan_member_changes(member: Member, repo_name: str, user_info: UserInfo,
+                        access_snapshot: RepoAccessSnapshot | None, permission: str) -> List[PlannedChange]:
+    # A missing access snapshot means that the personal repo does not exist yet
+    if not member.active:
+        if access_snapshot is None:
+            return []
+        changes = []
+        if access_snapshot.is_collaborator(user_info):
+            changes.append(PlannedChange(REVOKE_ACCESS, member, repo_name))
+        invitation = access_snapshot.get_pending_invitation(user_info)
+        if invitation is not None:
+            changes.append(PlannedChange(CANCEL_INVITATION, member, repo_name, invitation_id=invitation.id))
+        return changes
+
+    if access_snapshot is None:
+        return [
+            PlannedChange(CREATE_REPO, member, repo_name),
+            PlannedChange(INVITE, member, repo_name, permission),
+        ]
+
+    role = ROLE_BY_PERMISSION[permission]
+    current_role = access_snapshot.get_permission(user_info)
+    if current_role is not None:
+        return [] if current_role == role else [PlannedChange(UPDATE_PERMISSION, member, repo_name, permission)]
+
+    invitation = access_snapshot.get_pending_invitation(user_info)
+    if invitation is None:
+        return [PlannedChange(INVITE, member, repo_name, permission)]
+    if invitation.permissions != role:
+        return [PlannedChange(REPLACE_INVITATION, member, repo_name, permission, invitation.id, cost=2)]
+    return []
+
+
+def log_plan(changes: List[PlannedChange]) -> None:
+    if not changes:
+        logm.info("Plan: no changes, the org matches the class")
+        return
+    logm.info("Plan:")
+    for change in changes:
+        logm.info("  - %s", change)
+    logm.info("Plan: %d changes for %d members, %d API requests", len(changes),
+              len({change.member.github_username for change in changes}), sum(change.cost for change in changes))
@@ -3,11 +3,12 @@ import json
 import jsonschema
 
 from pathlib import Path
-from typing import List, Optional, Dict, Iterator
+from typing import List, Optional, Dict, Iterable, Iterator
 
-from github.PaginatedList import PaginatedList
 from github.Repository import Repository
 
+from classroom_utils import profiling
+
 
 FILE_DIR = Path(__file__).parent
 
@@ -41,7 +42,7 @@ class Member(User):
         else:
             return f"{name}_{surname}"
 
-    def find_personal_repo(self, repos: PaginatedList[Repository]) -> Repository | None:
+    def find_personal_repo(self, repos: Iterable[Repository]) -> Repository | None:
         minimal_repo_name = self.generate_personal_repo_name()
 
         for repo in repos:
@@ -101,7 +102,8 @@ class Classes:
             with open(classlist_filepath, encoding="utf-8") as classlist_file:
 
                 classlist_dict = json.load(classlist_file)
-                jsonschema.validate(instance=classlist_dict, schema=json_schema)
+                with profiling.section(profiling.JSON_SCHEMA_VALIDATION):
+                    jsonschema.validate(instance=classlist_dict, schema=json_schema)
 
                 for class_name, class_dict in classlist_dict["classes"].items():
                     new_class = Class(class_name)
@@ -16,6 +16,8 @@ from classroom_utils.ascii_art import CLASSROOM_UTILS_BANNER_2
 from classroom_utils import dialogs, github_operations, local_operations
 from classroom_utils.classes import Classes, Member
 from classroom_utils.config import Config
+from classroom_utils.github_cache import HttpCache
+from classroom_utils.github_inventory import RootCommitCache, UserCache
 from classroom_utils.github_operations import GithubCredentials
 from classroom_utils.subcommands import Command, RootCommand, SubcommandNotAvailableError
 
@@ -58,7 +60,7 @@ class PromptRootCommand(RootCommand):
                 try:
                     logm.debug("Entered command: %s", subcommand_string)
                     subcommand = self.find_subcommand(subcommand_string)
-                    subcommand.handle(args)
+                    subcommand.execute(args)
                 except KeyboardInterrupt as e:
                     logm.info("Command aborted...")
                 except SubcommandNotAvailableError as e:
@@ -170,17 +172,53 @@ class GithubSubCommand(ClassroomUtilsBaseCommand):
             default=None
         )
 
+        self.parser.add_argument(
+            "-j",
+            "--jobs",
+            help="Number of parallel workers for bulk operations (Default: 1).",
+            type=int,
+            default=None
+        )
+
+        self.parser.add_argument(
+            "--no-cache",
+            help=f"Disable the persistent caches for GitHub API responses ({HttpCache.DEFAULT_PATH}), user "
+                 f"resolutions ({UserCache.DEFAULT_PATH}) and root commits ({RootCommitCache.DEFAULT_PATH}).",
+            action="store_true"
+        )
+
+        self.parser.add_argument(
+            "--metrics-out",
+            help="Write per-endpoint request metrics as JSON to this file instead of printing a summary table.",
+            type=Path,
+            default=None
+        )
+
         self.github_ops: None | github_operations.GithubOperations = None
 
     def prepare_handler(self, args: argparse.Namespace) -> None:
         super().prepare_handler(args)
         try:
             github_credentials = self.get_github_credentials(args)
-            self.github_ops = github_operations.GithubOperations(self.classes, github_credentials)
+            self.github_ops = github_operations.GithubOperations(self.classes, github_credentials, self.read_jobs(args),
+                                                                 self.create_http_cache(args),
+                                                                 self.create_user_cache(args),
+                                                                 self.create_root_commit_cache(args))
         except GithubCredentialsNotFoundError as e:
             logm.error(e)
             sys.exit(-1)
 
+    def finish_handler(self, args: argparse.Namespace) -> None:
+        super().finish_handler(args)
+        if self.github_ops is not None:
+            if hasattr(args, "metrics_out") and args.metrics_out:
+                self.github_ops.metrics.write_json(args.metrics_out)
+            else:
+                self.github_ops.log_metrics()
+            self.github_ops.log_request_summary()
+            self.github_ops.log_quota_usage()
+            self.github_ops.github_session.close()
+
     def read_github_token(self, args: argparse.Namespace) -> str:
         if hasattr(args, "github_token") and args.github_token:
             logm.debug("Using GitHub token provided via cli argument.")
@@ -197,6 +235,28 @@ class GithubSubCommand(ClassroomUtilsBaseCommand):
         logm.debug("Using GitHub username from config.")
         return self.config.github_username
 
+    def read_jobs(self, args: argparse.Namespace) -> int:
+        if hasattr(args, "jobs") and args.jobs:
+            logm.debug("Using %d parallel jobs.", args.jobs)
+            return args.jobs
+        return 1
+
+    def create_http_cache(self, args: argparse.Namespace) -> HttpCache | None:
+        if hasattr(args, "no_cache") and args.no_cache:
+            logm.debug("HTTP cache disabled.")
+            return None
+        return HttpCache()
+
+    def create_user_cache(self, args: argparse.Namespace) -> UserCache:
+        if hasattr(args, "no_cache") and args.no_cache:
+            return UserCache()
+        return UserCache(UserCache.DEFAULT_PATH)
+
+    def create_root_commit_cache(self, args: argparse.Namespace) -> RootCommitCache:
+        if hasattr(args, "no_cache") and args.no_cache:
+            return RootCommitCache()
+        return RootCommitCache(RootCommitCache.DEFAULT_PATH)
+
     @classmethod
     def get_printable_token(cls, token: str) -> str:
         return f"{(len(token) - 4) * '*'}{token[-4:]}"
@@ -272,8 +332,17 @@ class GithubOrgSubCommand(GithubSubCommand):
 
 
 class GithubOrgInitSubCommand(GithubOrgSubCommand):
+
+    RESUMABLE = True
+
     def __init__(self, parser):
         super().__init__(parser)
+        if self.RESUMABLE:
+            self.parser.add_argument(
+                "--resume",
+                help="Skip members completed by a previous interrupted run of the same command.",
+                action="store_true"
+            )
         self.parser.add_argument('--class-name', type=str, default=None, help="Class name")
         self.parser.add_argument(
             "--repo-prefix",
@@ -295,17 +364,73 @@ class GithubOrgInitSubCommand(GithubOrgSubCommand):
         class_name = self.get_class_name_from_user(args)
         repo_prefix = self.get_repo_prefix_from_user(args)
         template = self.get_template_from_user(args)
+        resume = hasattr(args, "resume") and args.resume
 
         logm.debug(f"github org init:")
         logm.debug("\t-org_name=%s", org_name)
         logm.debug("\t-class_name=%s", class_name)
         logm.debug("\t-repo_prefix=%s", repo_prefix)
         logm.debug("\t-template=%s", template)
+        logm.debug("\t-resume=%s", resume)
+
+        self.github_ops.org_create_personal_repos(org_name, class_name, repo_prefix, template, resume)
 
-        self.github_ops.org_create_personal_repos(org_name, class_name, repo_prefix, template)
+
+class GithubClassPlanSubCommand(GithubOrgInitSubCommand):
+
+    RESUMABLE = False
+
+    def __init__(self, parser):
+        super().__init__(parser)
+        self.parser.add_argument(
+            "--permission",
+            help="Permission of active class members on their personal repos (push or pull)",
+            type=str,
+            choices=["push", "pull"],
+            default=None
+        )
+
+    def handle(self, args: argparse.Namespace) -> None:
+        self.prepare_handler(args)
+        org_name = self.get_org_name_from_user(args)
+        class_name = self.get_class_name_from_user(args)
+        repo_prefix = self.get_repo_prefix_from_user(args)
+        permission = self.get_permission_from_user(args)
+
+        logm.debug("github class plan:")
+        logm.debug("\t-org_name=%s", org_name)
+        logm.debug("\t-class_name=%s", class_name)
+        logm.debug("\t-repo_prefix=%s", repo_prefix)
+        logm.debug("\t-permission=%s", permission)
+
+        self.github_ops.class_plan(org_name, class_name, repo_prefix, permission)
+
+
+class GithubClassApplySubCommand(GithubClassPlanSubCommand):
+
+    def handle(self, args: argparse.Namespace) -> None:
+        self.prepare_handler(args)
+        org_name = self.get_org_name_from_user(args)
+        class_name = self.get_class_name_from_user(args)
+        repo_prefix = self.get_repo_prefix_from_user(args)
+        template = self.get_template_from_user(args)
+        permission = self.get_permission_from_user(args)
+
+        logm.debug("github class apply:")
+        logm.debug("\t-org_name=%s", org_name)
+        logm.debug("\t-class_name=%s", class_name)
+        logm.debug("\t-repo_prefix=%s", repo_prefix)
+        logm.debug("\t-template=%s", template)
+        logm.debug("\t-permission=%s", permission)
+
+        self.github_ops.class_apply(org_name, class_name, repo_prefix, template, permission)
 
 
 class GithubOrgCloneSubCommand(GithubOrgSubCommand):
+
+    DEFAULT_TIMEOUT = 600.0
+    DEFAULT_RETRIES = 2
+
     def __init__(self, parser):
         super().__init__(parser)
         self.parser.add_argument('--class-name', type=str, default=None, help="Class name")
@@ -316,17 +441,53 @@ class GithubOrgCloneSubCommand(GithubOrgSubCommand):
             type=Path,
             default=Path.cwd()
         )
+        self.parser.add_argument(
+            "--timeout",
+            help="Timeout in seconds for cloning a single repo.",
+            type=float,
+            default=self.DEFAULT_TIMEOUT
+        )
+        self.parser.add_argument(
+            "--retries",
+            help="Number of retries of a failed clone.",
+            type=int,
+            default=self.DEFAULT_RETRIES
+        )
+        self.parser.add_argument(
+            "--incremental",
+            help="Reuse an existing backup and only fetch repos that changed since the last run. The default branch "
+                 "of fetched repos is reset to its state on GitHub, local changes in the backup are discarded.",
+            action="store_true"
+        )
+        self.parser.add_argument(
+            "--reference-repo",
+            help="Full name of a repo (e.g. the template) whose objects are stored once and shared by all clones via "
+                 "git alternates. This saves disk space, but not download time, because repos generated from a "
+                 "template share files but no commits with it. The clones depend on the shared object store, so keep "
+                 "it with the backup.",
+            type=str,
+            default=None
+        )
 
     def handle(self, args: argparse.Namespace) -> None:
         self.prepare_handler(args)
         org_name = self.get_org_name_from_user(args)
         working_dir = args.working_dir
+        # The namespace of the interactive prompt lacks the arguments of the subcommands
+        timeout = args.timeout if hasattr(args, "timeout") else self.DEFAULT_TIMEOUT
+        retries = args.retries if hasattr(args, "retries") else self.DEFAULT_RETRIES
+        incremental = hasattr(args, "incremental") and args.incremental
+        reference_repo = args.reference_repo if hasattr(args, "reference_repo") else None
 
         logm.debug(f"github org clone:")
         logm.debug("\t-org_name=%s", org_name)
         logm.debug("\t-working_dir=%s", working_dir)
+        logm.debug("\t-timeout=%s", timeout)
+        logm.debug("\t-retries=%s", retries)
+        logm.debug("\t-incremental=%s", incremental)
+        logm.debug("\t-reference_repo=%s", reference_repo)
 
-        self.github_ops.clone_org(org_name, working_dir)
+        self.github_ops.clone_org(org_name, working_dir, timeout, retries, incremental, reference_repo)
 
 
 class GithubOrgAccessSubCommand(GithubOrgSubCommand):
@@ -359,17 +520,22 @@ class GithubOrgAccessGrantSubCommand(GithubOrgInitSubCommand):
         class_name = self.get_class_name_from_user(args)
         selected_class_members = self.get_selected_class_members_from_user(class_name)
         permission = self.get_permission_from_user(args)
+        resume = hasattr(args, "resume") and args.resume
 
         logm.debug(f"github org access grant:")
         logm.debug("\t-org_name=%s", org_name)
         logm.debug("\t-class_name=%s", class_name)
         logm.debug("\t-selected_class_members%s", selected_class_members)
         logm.debug("\t-permission=%s", permission)
+        logm.debug("\t-resume=%s", resume)
 
-        self.github_ops.org_access_grant_personal_repos(org_name, selected_class_members, permission)
+        self.github_ops.org_access_grant_personal_repos(org_name, selected_class_members, permission, resume)
 
 
 class GithubOrgAccessRevokeSubCommand(GithubOrgInitSubCommand):
+
+    RESUMABLE = False
+
     def __init__(self, parser):
         super().__init__(parser)
 
@@ -388,6 +554,9 @@ class GithubOrgAccessRevokeSubCommand(GithubOrgInitSubCommand):
 
 
 class GithubOrgReviewCreateSubCommand(GithubOrgInitSubCommand):
+
+    RESUMABLE = False
+
     def __init__(self, parser):
         super().__init__(parser)
 
@@ -7,6 +7,8 @@ from typing import List
 
 import jsonschema
 
+from classroom_utils import profiling
+
 FILE_DIR = Path(__file__).parent
 
 logm = logging.getLogger("config")
@@ -80,7 +82,8 @@ class Config:
 
             with open(config_filepath) as config_file:
                 config_dict = json.load(config_file)
-                jsonschema.validate(instance=config_dict, schema=json_schema)
+                with profiling.section(profiling.JSON_SCHEMA_VALIDATION):
+                    jsonschema.validate(instance=config_dict, schema=json_schema)
 
                 self.github_token = config_dict["github_token"]
                 self.github_username = config_dict["github_username"]
@@ -5,13 +5,14 @@ from typing import List
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 
-from classroom_utils import github_operations
+from classroom_utils import github_operations, profiling
 from classroom_utils.classes import Member
 
 
 logm = logging.getLogger("dialogs")
 
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_class_name(available_classes: List[str]) -> str:
     available_classes = [class_name for class_name in available_classes]
     logm.debug("Available classes: %s", available_classes)
@@ -22,6 +23,7 @@ def user_input_request_class_name(available_classes: List[str]) -> str:
     ).execute()
 
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_org_name(github_ops: github_operations.GithubOperations) -> str:
     available_orgs = github_ops.get_org_names()
     logm.debug("Available orgs: %s",available_orgs)
@@ -32,6 +34,7 @@ def user_input_request_org_name(github_ops: github_operations.GithubOperations)
     ).execute()
 
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_repo_name(github_ops: github_operations.GithubOperations) -> str:
     org_name = user_input_request_org_name(github_ops)
     full_repo_names_of_org = github_ops.get_full_repo_names_by_org(org_name)
@@ -43,6 +46,7 @@ def user_input_request_repo_name(github_ops: github_operations.GithubOperations)
     ).execute()
 
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_repo_permission() -> str:
     return inquirer.select(
         message="Choose a permission:",
@@ -51,6 +55,7 @@ def user_input_request_repo_permission() -> str:
     ).execute()
 
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_selected_class_members(class_members: List[Member]) -> List[Member]:
     choices = [Choice(class_member.fullname, enabled=True) for class_member in class_members]
     result = inquirer.checkbox(
@@ -67,6 +72,7 @@ def user_input_request_selected_class_members(class_members: List[Member]) -> Li
     return selected_class_members
 
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_optional_repo_prefix() -> str | None:
     yes = inquirer.confirm(message="Specify repo prefix?", default=False).execute()
 
@@ -81,6 +87,7 @@ def user_input_request_optional_repo_prefix() -> str | None:
     return prefix.rstrip("_")
 
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_optional_template_repo_name(github_ops: github_operations.GithubOperations) -> str | None:
     yes = inquirer.confirm(message="Specify repo template?", default=False).execute()
 
@@ -103,12 +110,14 @@ def user_input_request_optional_template_repo_name(github_ops: github_operations
         border=True
     ).execute()
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_head_branch_name() -> str | None:
     return inquirer.text(
         message="Head branch name:",
         multicolumn_complete=True,
     ).execute()
 
+@profiling.timed(profiling.DIALOGS)
 def user_input_request_review_branch_name() -> str | None:
     return inquirer.text(
         message="Review branch name:",
@@ -0,0 +1,546 @@
+# Copyright (C) 2024 twyleg
+import hashlib
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+
+logm = logging.getLogger("fake_github_server")
+
+
+# Permission levels in ascending order, a collaborator has every permission up to its level
+PERMISSION_LEVELS = ("pull", "triage", "push", "maintain", "admin")
+INVITATION_PERMISSIONS = {"pull": "read", "triage": "triage", "push": "write", "maintain": "maintain", "admin": "admin"}
+
+AUTHENTICATED_LOGIN = "fake-user"
+
+
+class FakeRequest(NamedTuple):
+    verb: str
+    path: str
+    query: Dict[str, str]
+    body: Any
+    base_url: str
+    headers: Dict[str, str] = {}
+
+
+class FakeResponse(NamedTuple):
+    status: int
+    body: Any = None
+    headers: Dict[str, str] = {}
+
+
+def _error(status: int, message: str) -> FakeResponse:
+    return FakeResponse(status, {"message": message, "documentation_url": "https://docs.github.com/rest"})
+
+
+def _timestamp(seconds: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+
+def _with_repo(handler: Callable[..., FakeResponse]) -> Callable[..., FakeResponse]:
+    def wrapper(self: "FakeGithub", request: FakeRequest, owner: str, repo: str, **kwargs: str) -> FakeResponse:
+        found_repo = self._find_repo(owner, repo)
+        if found_repo is None:
+            return _error(404, "Not Found")
+        return handler(self, request, found_repo, **kwargs)
+    return wrapper
+
+
+class FakeRepo:
+
+    def __init__(self, repo_id: int, owner: Dict[str, Any], name: str, private: bool, is_template: bool):
+        self.id = repo_id
+        self.owner = owner
+        self.name = name
+        self.private = private
+        self.is_template = is_template
+        self.default_branch = "main"
+        self.created_at = time.time()
+        self.pushed_at: float | None = None
+        # Commit shas of every branch, oldest first
+        self.branches: Dict[str, List[str]] = {}
+        self.collaborators: Dict[int, str] = {}
+        self.invitations: Dict[int, Tuple[int, str]] = {}
+        self.pulls: List[Dict[str, Any]] = []
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner['login']}/{self.name}"
+
+    def history(self, sha: str) -> List[str] | None:
+        for commits in self.branches.values():
+            if sha in commits:
+                return commits[:commits.index(sha) + 1]
+        return None
+
+
+class FakeGithub:
+    # In-memory state of the GitHub REST and GraphQL endpoints used by GithubOperations. Latency and the primary
+    # rate limit are simulated per request, so bulk operations behave like against the real API, just faster.
+
+    DEFAULT_PER_PAGE = 30
+    MAX_PER_PAGE = 100
+
+    ROUTES: List[Tuple[str, str, str]] = [
+        ("GET", r"/rate_limit", "get_rate_limit"),
+        ("POST", r"/graphql", "post_graphql"),
+        ("GET", r"/user", "get_authenticated_user"),
+        ("GET", r"/user/orgs", "get_authenticated_user_orgs"),
+        ("GET", r"/users/(?P<login>[^/]+)", "get_user"),
+        ("GET", r"/orgs/(?P<org>[^/]+)", "get_org"),
+        ("GET", r"/orgs/(?P<org>[^/]+)/repos", "get_org_repos"),
+        ("POST", r"/orgs/(?P<org>[^/]+)/repos", "post_org_repo"),
+        ("GET", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)", "get_repo"),
+        ("POST", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/generate", "post_generate"),
+        ("GET", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/collaborators", "get_collaborators"),
+        ("PUT", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/collaborators/(?P<login>[^/]+)", "put_collaborator"),
+        ("DELETE", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/collaborators/(?P<login>[^/]+)", "delete_collaborator"),
+        ("GET", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/invitations", "get_invitations"),
+        ("DELETE", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/invitations/(?P<invitation_id>\d+)", "delete_invitation"),
+        ("GET", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/branches/(?P<branch>.+)", "get_branch"),
+        ("GET", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/commits", "get_commits"),
+        ("POST", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/git/refs", "post_ref"),
+        ("GET", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/pulls", "get_pulls"),
+        ("POST", r"/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/pulls", "post_pull"),
+    ]
+
+    GRAPHQL_USER_PATTERN = re.compile(r'(\w+): user\(login: ("(?:[^"\\]|\\.)*")\)')
+
+    def __init__(self, latency: float = 0.0, rate_limit: int = 5000, rate_limit_window: float = 3600.0,
+                 generated_repo_commits: int = 1):
+        self.latency = latency
+        self.generated_repo_commits = max(1, generated_repo_commits)
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.request_count = 0
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._orgs: Dict[str, Dict[str, Any]] = {}
+        self._repos: Dict[str, FakeRepo] = {}
+        self._rate_limit_windows: Dict[str, Tuple[float, int]] = {}
+        self._routes = [(verb, re.compile(f"{pattern}/?$"), getattr(self, name)) for verb, pattern, name in self.ROUTES]
+        self.add_user(AUTHENTICATED_LOGIN)
+
+    def add_user(self, login: str, name: str | None = None) -> int:
+        with self._lock:
+            user_id = next(self._ids)
+            self._users[login.lower()] = {"login": login, "id": user_id, "name": name, "type": "User"}
+            return user_id
+
+    def add_org(self, login: str) -> None:
+        with self._lock:
+            self._orgs[login.lower()] = {"login": login, "id": next(self._ids), "type": "Organization"}
+
+    def add_repo(self, owner: str, name: str, is_template: bool = False, commits: int = 1,
+                 private: bool = True) -> FakeRepo:
+        with self._lock:
+            account = self._orgs.get(owner.lower()) or self._users[owner.lower()]
+            repo = FakeRepo(next(self._ids), account, name, private, is_template)
+            self._repos[repo.full_name.lower()] = repo
+            for _ in range(commits):
+                self.add_commit(repo.full_name)
+            return repo
+
+    def add_commit(self, full_repo_name: str, branch: str = "main") -> str:
+        with self._lock:
+            repo = self._repos[full_repo_name.lower()]
+            commits = repo.branches.setdefault(branch, [])
+            sha = hashlib.sha1(f"{repo.full_name}/{branch}/{next(self._ids)}".encode()).hexdigest()
+            commits.append(sha)
+            repo.pushed_at = time.time()
+            return sha
+
+    def add_collaborator(self, full_repo_name: str, login: str, permission: str = "push") -> None:
+        with self._lock:
+            self._repos[full_repo_name.lower()].collaborators[self._users[login.lower()]["id"]] = permission
+
+    def get_repo_state(self, full_repo_name: str) -> FakeRepo | None:
+        with self._lock:
+            return self._repos.get(full_repo_name.lower())
+
+    def handle(self, request: FakeRequest) -> FakeResponse:
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.request_count += 1
+            for verb, pattern, handler in self._routes:
+                match = pattern.match(request.path)
+                if verb == request.verb and match:
+                    break
+            else:
+                return _error(404, "Not Found")
+
+            if "Authorization" not in request.headers:
+                return _error(401, "Requires authentication")
+            if handler == self.get_rate_limit:
+                # Querying the rate limit status is free, just like on GitHub
+                return handler(request)
+
+            resource = "graphql" if handler == self.post_graphql else "core"
+            reset, used = self._rate_limit_window(resource)
+            if used >= self.rate_limit:
+                return FakeResponse(403, {"message": "API rate limit exceeded for user ID 1."},
+                                    self._rate_limit_headers(resource, reset, used))
+
+            response = handler(request, **match.groupdict())
+            if request.verb == "GET" and response.status == 200:
+                etag = f'"{hashlib.sha1(json.dumps(response.body).encode()).hexdigest()}"'
+                response = response._replace(headers={**response.headers, "ETag": etag})
+                if request.headers.get("If-None-Match") == etag:
+                    # Conditional requests answered with 304 don't count against the rate limit
+                    return FakeResponse(304, None, {**response.headers, **self._rate_limit_headers(resource, reset, used)})
+            self._rate_limit_windows[resource] = (reset, used + 1)
+            return response._replace(headers={**response.headers,
+                                              **self._rate_limit_headers(resource, reset, used + 1)})
+
+    def _rate_limit_window(self, resource: str) -> Tuple[float, int]:
+        now = time.time()
+        reset, used = self._rate_limit_windows.get(resource, (0.0, 0))
+        if now >= reset:
+            reset, used = now + self.rate_limit_window, 0
+            self._rate_limit_windows[resource] = (reset, used)
+        return reset, used
+
+    def _rate_limit_headers(self, resource: str, reset: float, used: int) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(self.rate_limit - used, 0)),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Reset": str(int(reset)),
+            "X-RateLimit-Resource": resource,
+        }
+
+    def _rate_limit_status(self, resource: str) -> Dict[str, int]:
+        reset, used = self._rate_limit_window(resource)
+        return {"limit": self.rate_limit, "remaining": max(self.rate_limit - used, 0), "used": used,
+                "reset": int(reset)}
+
+    def _paginate(self, request: FakeRequest, items: List[Any]) -> FakeResponse:
+        per_page = min(int(request.query.get("per_page", self.DEFAULT_PER_PAGE)), self.MAX_PER_PAGE)
+        page = int(request.query.get("page", 1))
+        last_page = max((len(items) + per_page - 1) // per_page, 1)
+
+        def page_url(page_number: int) -> str:
+            query = urlencode({**request.query, "per_page": per_page, "page": page_number})
+            return f"{request.base_url}{request.path}?{query}"
+
+        links = []
+        if page < last_page:
+            links.append(f'<{page_url(page + 1)}>; rel="next"')
+            links.append(f'<{page_url(last_page)}>; rel="last"')
+        if page > 1:
+            links.append(f'<{page_url(1)}>; rel="first"')
+            links.append(f'<{page_url(page - 1)}>; rel="prev"')
+        headers = {"Link": ", ".join(links)} if links else {}
+        return FakeResponse(200, items[(page - 1) * per_page:page * per_page], headers)
+
+    def _user_json(self, user: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        return {**user, "url": f"{base_url}/users/{user['login']}"}
+
+    def _org_json(self, org: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        return {**org, "url": f"{base_url}/orgs/{org['login']}", "repos_url": f"{base_url}/orgs/{org['login']}/repos"}
+
+    def _repo_json(self, repo: FakeRepo, base_url: str) -> Dict[str, Any]:
+        return {
+            "id": repo.id,
+            "name": repo.name,
+            "full_name": repo.full_name,
+            "owner": self._user_json(repo.owner, base_url),
+            "private": repo.private,
+            "is_template": repo.is_template,
+            "default_branch": repo.default_branch,
+            "url": f"{base_url}/repos/{repo.full_name}",
+            "html_url": f"https://github.com/{repo.full_name}",
+            "clone_url": f"https://github.com/{repo.full_name}.git",
+            "created_at": _timestamp(repo.created_at),
+            "updated_at": _timestamp(repo.pushed_at or repo.created_at),
+            "pushed_at": _timestamp(repo.pushed_at) if repo.pushed_at else None,
+        }
+
+    def _invitation_json(self, repo: FakeRepo, invitation_id: int, base_url: str) -> Dict[str, Any]:
+        invitee_id, permission = repo.invitations[invitation_id]
+        invitee = next(user for user in self._users.values() if user["id"] == invitee_id)
+        return {
+            "id": invitation_id,
+            "invitee": self._user_json(invitee, base_url),
+            "inviter": self._user_json(self._users[AUTHENTICATED_LOGIN], base_url),
+            "permissions": INVITATION_PERMISSIONS[permission],
+            "repository": self._repo_json(repo, base_url),
+            "url": f"{base_url}/repos/{repo.full_name}/invitations/{invitation_id}",
+            "created_at": _timestamp(repo.created_at),
+        }
+
+    def _pull_json(self, repo: FakeRepo, pull: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        url = f"{base_url}/repos/{repo.full_name}/pulls/{pull['number']}"
+        return {
+            **pull,
+            "url": url,
+            "head": {"ref": pull["head"], "label": f"{repo.owner['login']}:{pull['head']}",
+                     "sha": repo.branches[pull["head"]][-1]},
+            "base": {"ref": pull["base"], "label": f"{repo.owner['login']}:{pull['base']}",
+                     "sha": repo.branches[pull["base"]][-1]},
+        }
+
+    def _find_repo(self, owner: str, repo: str) -> FakeRepo | None:
+        return self._repos.get(f"{owner}/{repo}".lower())
+
+    def get_rate_limit(self, request: FakeRequest) -> FakeResponse:
+        core = self._rate_limit_status("core")
+        return FakeResponse(200, {"resources": {"core": core, "graphql": self._rate_limit_status("graphql")},
+                                  "rate": core})
+
+    def post_graphql(self, request: FakeRequest) -> FakeResponse:
+        data: Dict[str, Any] = {}
+        errors: List[Dict[str, Any]] = []
+        for alias, login in self.GRAPHQL_USER_PATTERN.findall(request.body.get("query", "")):
+            login = json.loads(login)
+            user = self._users.get(login.lower())
+            if user is None:
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias],
+                               "message": f"Could not resolve to a User with the login of '{login}'."})
+            else:
+                data[alias] = {"login": user["login"], "databaseId": user["id"], "name": user["name"]}
+        return FakeResponse(200, {"data": data, "errors": errors} if errors else {"data": data})
+
+    def get_authenticated_user(self, request: FakeRequest) -> FakeResponse:
+        return FakeResponse(200, self._user_json(self._users[AUTHENTICATED_LOGIN], request.base_url))
+
+    def get_authenticated_user_orgs(self, request: FakeRequest) -> FakeResponse:
+        return self._paginate(request, [self._org_json(org, request.base_url) for org in self._orgs.values()])
+
+    def get_user(self, request: FakeRequest, login: str) -> FakeResponse:
+        user = self._users.get(login.lower())
+        return FakeResponse(200, self._user_json(user, request.base_url)) if user else _error(404, "Not Found")
+
+    def get_org(self, request: FakeRequest, org: str) -> FakeResponse:
+        account = self._orgs.get(org.lower())
+        return FakeResponse(200, self._org_json(account, request.base_url)) if account else _error(404, "Not Found")
+
+    def get_org_repos(self, request: FakeRequest, org: str) -> FakeResponse:
+        if org.lower() not in self._orgs:
+            return _error(404, "Not Found")
+        repos = [repo for repo in self._repos.values() if repo.owner["login"].lower() == org.lower()]
+        return self._paginate(request, [self._repo_json(repo, request.base_url) for repo in repos])
+
+    def _create_repo(self, request: FakeRequest, owner: str, name: str, private: bool) -> FakeRepo | FakeResponse:
+        if owner.lower() not in self._orgs:
+            return _error(404, "Not Found")
+        if self._find_repo(owner, name) is not None:
+            return _error(422, "Repository creation failed: name already exists on this account")
+        return self.add_repo(owner, name, commits=0, private=private)
+
+    def post_org_repo(self, request: FakeRequest, org: str) -> FakeResponse:
+        repo = self._create_repo(request, org, request.body["name"], request.body.get("private", False))
+        if isinstance(repo, FakeResponse):
+            return repo
+        if request.body.get("auto_init"):
+            self.add_commit(repo.full_name)
+        return FakeResponse(201, self._repo_json(repo, request.base_url))
+
+    def post_generate(self, request: FakeRequest, owner: str, repo: str) -> FakeResponse:
+        template = self._find_repo(owner, repo)
+        if template is None:
+            return _error(404, "Not Found")
+        if not template.is_template:
+            return _error(422, f"{template.full_name} is not a template repository")
+        generated = self._create_repo(request, request.body.get("owner", owner), request.body["name"],
+                                      request.body.get("private", False))
+        if isinstance(generated, FakeResponse):
+            return generated
+        # Like on GitHub, the generated repo starts with a new root commit instead of the template's history. Further
+        # commits simulate work pushed by the students, e.g. so reviews find a head that differs from the root commit.
+        branches = template.branches if request.body.get("include_all_branches") else [template.default_branch]
+        for branch in branches:
+            for _ in range(self.generated_repo_commits):
+                self.add_commit(generated.full_name, branch)
+        return FakeResponse(201, self._repo_json(generated, request.base_url))
+
+    def get_repo(self, request: FakeRequest, owner: str, repo: str) -> FakeResponse:
+        found_repo = self._find_repo(owner, repo)
+        if found_repo is None:
+            return _error(404, "Not Found")
+        return FakeResponse(200, self._repo_json(found_repo, request.base_url))
+
+    @_with_repo
+    def get_collaborators(self, request: FakeRequest, repo: FakeRepo) -> FakeResponse:
+        collaborators = []
+        for user in self._users.values():
+            permission = repo.collaborators.get(user["id"])
+            if permission is None:
+                continue
+            level = PERMISSION_LEVELS.index(permission)
+            permissions = {name: PERMISSION_LEVELS.index(name) <= level for name in PERMISSION_LEVELS}
+            collaborators.append({**self._user_json(user, request.base_url), "permissions": permissions,
+                                  "role_name": INVITATION_PERMISSIONS[permission]})
+        return self._paginate(request, collaborators)
+
+    @_with_repo
+    def put_collaborator(self, request: FakeRequest, repo: FakeRepo, login: str) -> FakeResponse:
+        user = self._users.get(login.lower())
+        if user is None:
+            return _error(404, "Not Found")
+        permission = (request.body or {}).get("permission", "push")
+        if permission not in PERMISSION_LEVELS:
+            return _error(422, f"Invalid permission '{permission}'")
+        if user["id"] in repo.collaborators:
+            repo.collaborators[user["id"]] = permission
+            return FakeResponse(204)
+        # Inviting again updates the pending invitation instead of creating another one
+        invitation_id = next((invitation_id for invitation_id, (invitee_id, _) in repo.invitations.items()
+                              if invitee_id == user["id"]), None) or next(self._ids)
+        repo.invitations[invitation_id] = (user["id"], permission)
+        return FakeResponse(201, self._invitation_json(repo, invitation_id, request.base_url))
+
+    @_with_repo
+    def delete_collaborator(self, request: FakeRequest, repo: FakeRepo, login: str) -> FakeResponse:
+        user = self._users.get(login.lower())
+        if user is None:
+            return _error(404, "Not Found")
+        repo.collaborators.pop(user["id"], None)
+        return FakeResponse(204)
+
+    @_with_repo
+    def get_invitations(self, request: FakeRequest, repo: FakeRepo) -> FakeResponse:
+        return self._paginate(request, [self._invitation_json(repo, invitation_id, request.base_url)
+                                        for invitation_id in repo.invitations])
+
+    @_with_repo
+    def delete_invitation(self, request: FakeRequest, repo: FakeRepo, invitation_id: str) -> FakeResponse:
+        if repo.invitations.pop(int(invitation_id), None) is None:
+            return _error(404, "Not Found")
+        return FakeResponse(204)
+
+    @_with_repo
+    def get_branch(self, request: FakeRequest, repo: FakeRepo, branch: str) -> FakeResponse:
+        commits = repo.branches.get(branch)
+        if not commits:
+            return _error(404, "Branch not found")
+        return FakeResponse(200, {"name": branch, "protected": False,
+                                  "commit": {"sha": commits[-1],
+                                             "url": f"{request.base_url}/repos/{repo.full_name}/commits/{commits[-1]}"}})
+
+    @_with_repo
+    def get_commits(self, request: FakeRequest, repo: FakeRepo) -> FakeResponse:
+        ref = request.query.get("sha", repo.default_branch)
+        commits = repo.branches.get(ref) or repo.history(ref)
+        if not commits:
+            return _error(409, "Git Repository is empty.") if not repo.branches else _error(404, "Not Found")
+        return self._paginate(request, [{"sha": sha, "url": f"{request.base_url}/repos/{repo.full_name}/commits/{sha}"}
+                                        for sha in reversed(commits)])
+
+    @_with_repo
+    def post_ref(self, request: FakeRequest, repo: FakeRepo) -> FakeResponse:
+        ref, sha = request.body["ref"], request.body["sha"]
+        if not ref.startswith("refs/heads/"):
+            return _error(422, "Reference name must start with 'refs/heads/'")
+        branch = ref[len("refs/heads/"):]
+        if branch in repo.branches:
+            return _error(422, "Reference already exists")
+        history = repo.history(sha)
+        if history is None:
+            return _error(422, "Object does not exist")
+        repo.branches[branch] = history
+        return FakeResponse(201, {"ref": ref, "url": f"{request.base_url}/repos/{repo.full_name}/git/{ref}",
+                                  "object": {"sha": sha, "type": "commit"}})
+
+    @_with_repo
+    def get_pulls(self, request: FakeRequest, repo: FakeRepo) -> FakeResponse:
+        state = request.query.get("state", "open")
+        base = request.query.get("base")
+        head = request.query.get("head", "").split(":")[-1] or None
+        pulls = [pull for pull in repo.pulls if (state == "all" or pull["state"] == state) and
+                 (base is None or pull["base"] == base) and (head is None or pull["head"] == head)]
+        return self._paginate(request, [self._pull_json(repo, pull, request.base_url) for pull in pulls])
+
+    @_with_repo
+    def post_pull(self, request: FakeRequest, repo: FakeRepo) -> FakeResponse:
+        base, head = request.body["base"], request.body["head"].split(":")[-1]
+        if base not in repo.branches or head not in repo.branches:
+            return _error(422, "Validation Failed")
+        if repo.branches[base][-1] == repo.branches[head][-1]:
+            return _error(422, f"No commits between {base} and {head}")
+        if any(pull["state"] == "open" and pull["base"] == base and pull["head"] == head for pull in repo.pulls):
+            return _error(422, f"A pull request already exists for {repo.owner['login']}:{head}.")
+        pull = {"id": next(self._ids), "number": len(repo.pulls) + 1, "state": "open", "title": request.body["title"],
+                "body": request.body.get("body"), "base": base, "head": head}
+        repo.pulls.append(pull)
+        return FakeResponse(201, self._pull_json(repo, pull, request.base_url))
+
+
+class _FakeGithubRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections, like the GitHub API, so the pooled connections of GithubSession get reused
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, with Nagle's algorithm every response would wait for a delayed ACK
+    disable_nagle_algorithm = True
+    server: "_FakeGithubHttpServer"
+
+    def _handle(self) -> None:
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(length) if length else b""
+        request = FakeRequest(self.command, url.path, dict(parse_qsl(url.query)),
+                              json.loads(raw_body) if raw_body else None, f"http://{self.headers['Host']}",
+                              dict(self.headers.items()))
+
+        response = self.server.fake_github.handle(request)
+        body = json.dumps(response.body).encode() if response.body is not None else b""
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logm.debug("%s - %s", self.address_string(), format % args)
+
+
+class _FakeGithubHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+    HOST = "127.0.0.1"
+
+    def __init__(self, fake_github: FakeGithub, port: int):
+        super().__init__((self.HOST, port), _FakeGithubRequestHandler)
+        self.fake_github = fake_github
+
+
+class FakeGithubServer:
+
+    def __init__(self, fake_github: FakeGithub | None = None, port: int = 0):
+        self.fake_github = fake_github if fake_github is not None else FakeGithub()
+        self._http_server = _FakeGithubHttpServer(self.fake_github, port)
+        self._thread = threading.Thread(target=self._http_server.serve_forever, name="fake-github-server", daemon=True)
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self._http_server.HOST}:{self._http_server.server_port}"
+
+    def start(self) -> None:
+        self._thread.start()
+        logm.debug("Fake GitHub API listening on '%s'", self.api_url)
+
+    def stop(self) -> None:
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "FakeGithubServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
@@ -0,0 +1,195 @@
+# Copyright (C) 2024 twyleg
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple
+
+import git
+
+
+logm = logging.getLogger("git_operations")
+
+
+class RepoCloneError(Exception):
+    pass
+
+
+class RepoFetchError(Exception):
+    pass
+
+
+class BackupManifest:
+
+    FILE_NAME = ".backup_manifest.json"
+
+    def __init__(self, backup_dir: Path):
+        self.path = backup_dir / self.FILE_NAME
+        self._pushed_at_by_repo_name: Dict[str, str | None] = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as manifest_file:
+                    self._pushed_at_by_repo_name = json.load(manifest_file)
+            except (OSError, ValueError) as e:
+                logm.warning("Ignoring unreadable backup manifest '%s': %s", self.path, e)
+
+    def __contains__(self, repo_name: str) -> bool:
+        return repo_name in self._pushed_at_by_repo_name
+
+    def is_up_to_date(self, repo_name: str, pushed_at: str | None) -> bool:
+        return repo_name in self._pushed_at_by_repo_name and self._pushed_at_by_repo_name[repo_name] == pushed_at
+
+    def update(self, repo_name: str, pushed_at: str | None) -> None:
+        self._pushed_at_by_repo_name[repo_name] = pushed_at
+
+    def remove_missing(self, repo_names: Iterable[str]) -> List[str]:
+        existing_repo_names = set(repo_names)
+        removed_repo_names = sorted(set(self._pushed_at_by_repo_name) - existing_repo_names)
+        for repo_name in removed_repo_names:
+            del self._pushed_at_by_repo_name[repo_name]
+        return removed_repo_names
+
+    def save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self._pushed_at_by_repo_name, manifest_file, indent=2, sort_keys=True)
+
+
+# The helper answers git's credential requests from the environment of the git process it is configured for, so
+# the token is neither written to disk, nor shown on the command line, nor set in the environment of this process
+CREDENTIAL_HELPER = '!f() { echo "username=${CLASSROOM_UTILS_GIT_USERNAME}"; ' \
+                    'echo "password=${CLASSROOM_UTILS_GIT_TOKEN}"; }; f'
+
+
+class GitCredentials(NamedTuple):
+    username: str
+    token: str
+
+    def options(self) -> List[str]:
+        # The empty helper resets helpers configured by the user before adding our own
+        return ["-c", "credential.helper=", "-c", f"credential.helper={CREDENTIAL_HELPER}"]
+
+    def env(self) -> Dict[str, str]:
+        return {
+            "CLASSROOM_UTILS_GIT_USERNAME": self.username,
+            "CLASSROOM_UTILS_GIT_TOKEN": self.token,
+            "GIT_TERMINAL_PROMPT": "0",
+        }
+
+
+def _execute_with_retries(git_args: List[str], credentials: GitCredentials, description: str,
+                          timeout: float | None, retries: int, error_type: type,
+                          prepare: Callable[[], None] = lambda: None,
+                          cleanup: Callable[[], None] = lambda: None) -> int:
+    command = ["git", *credentials.options(), *git_args]
+    attempts = retries + 1
+    for attempt in range(1, attempts + 1):
+        prepare()
+        # GitPython's kill_after_timeout isn't supported on Windows, subprocess kills git on timeout on every platform.
+        # The output goes to a file instead of a pipe, which helpers spawned by git might keep open after the kill.
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                subprocess.run(command, env={**os.environ, **credentials.env()}, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=stderr_file, timeout=timeout, check=True)
+                return attempt
+            except subprocess.CalledProcessError as e:
+                stderr_file.seek(0)
+                last_error = stderr_file.read().decode(errors="replace").strip() or f"exit code {e.returncode}"
+            except subprocess.TimeoutExpired:
+                last_error = f"timed out after {timeout}s"
+        logm.warning("%s failed (attempt %d/%d): %s", description, attempt, attempts, last_error)
+        cleanup()
+
+    raise error_type(f"{description} failed after {attempts} attempt(s): {last_error}")
+
+
+def clone_repo(clone_url: str, target_dir: Path, username: str, token: str, timeout: float | None = None,
+               retries: int = 0, reference_dir: Path | None = None) -> int:
+    logm.debug("Clone URL: '%s'", clone_url)
+
+    reference_options = ["--reference", str(reference_dir)] if reference_dir else []
+
+    attempts = _execute_with_retries(
+        ["clone", *reference_options, "--", clone_url, str(target_dir)],
+        GitCredentials(username, token),
+        f"Cloning '{clone_url}'",
+        timeout,
+        retries,
+        RepoCloneError,
+        prepare=lambda: target_dir.mkdir(parents=True, exist_ok=True),
+        cleanup=lambda: shutil.rmtree(target_dir, ignore_errors=True)
+    )
+    if reference_dir:
+        _drop_borrowed_objects(target_dir)
+    return attempts
+
+
+def _drop_borrowed_objects(repo_dir: Path) -> None:
+    # Repos generated from a template start with a new root commit, so a clone shares no history with the reference
+    # and downloads the full pack anyway. Its blobs and trees are identical to the template's though, so repacking
+    # without the objects available via alternates saves the disk space (but not the download).
+    try:
+        git.Git().execute(["git", "-C", str(repo_dir), "repack", "-a", "-d", "-l", "-q"])
+    except git.GitCommandError as e:
+        logm.warning("Unable to drop objects of '%s' shared with the object store: %s", repo_dir, e)
+
+
+def fetch_repo(repo_dir: Path, username: str, token: str, timeout: float | None = None, retries: int = 0,
+               branch: str | None = None) -> int:
+    logm.debug("Fetch repo: '%s'", repo_dir)
+
+    attempts = _execute_with_retries(
+        ["-C", str(repo_dir), "fetch", "--prune", "--tags", "origin"],
+        GitCredentials(username, token),
+        f"Fetching '{repo_dir}'",
+        timeout,
+        retries,
+        RepoFetchError
+    )
+    if branch:
+        _check_out_remote_branch(repo_dir, branch)
+    return attempts
+
+
+def _check_out_remote_branch(repo_dir: Path, branch: str) -> None:
+    # Backups mirror GitHub, so the branch and working tree are reset to the fetched branch instead of merged. This
+    # also works after force pushes and when the default branch changed or didn't exist yet at the first clone.
+    remote_ref = f"refs/remotes/origin/{branch}"
+    try:
+        git.Git().execute(["git", "-C", str(repo_dir), "rev-parse", "--verify", "--quiet", remote_ref])
+    except git.GitCommandError:
+        logm.debug("Repo '%s' has no branch '%s' yet", repo_dir, branch)
+        return
+    try:
+        git.Git().execute(["git", "-C", str(repo_dir), "checkout", "--force", "-B", branch, remote_ref])
+    except git.GitCommandError as e:
+        raise RepoFetchError(f"Checking out '{branch}' in '{repo_dir}' failed: {e}")
+
+
+def update_object_store(clone_url: str, store_dir: Path, username: str, token: str, timeout: float | None = None,
+                        retries: int = 0) -> int:
+    logm.debug("Object store: '%s' <- '%s'", store_dir, clone_url)
+
+    # Clones borrow objects from the store, so it must never drop them: refs are not pruned and gc is disabled
+    if store_dir.is_dir():
+        return _execute_with_retries(
+            ["-C", str(store_dir), "fetch", "origin"],
+            GitCredentials(username, token),
+            f"Updating object store '{store_dir}'",
+            timeout,
+            retries,
+            RepoFetchError
+        )
+    return _execute_with_retries(
+        ["clone", "--mirror", "--config", "gc.auto=0", "--", clone_url, str(store_dir)],
+        GitCredentials(username, token),
+        f"Creating object store '{store_dir}'",
+        timeout,
+        retries,
+        RepoCloneError,
+        cleanup=lambda: shutil.rmtree(store_dir, ignore_errors=True)
+    )
@@ -0,0 +1,164 @@
+# Copyright (C) 2024 twyleg
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+
+from pathlib import Path
+from typing import NamedTuple
+
+import requests
+import requests.structures
+import requests.utils
+
+
+logm = logging.getLogger("github_cache")
+
+
+class CachedResponse(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    status_code: int
+    headers: dict
+    body: bytes
+
+
+class HttpCache:
+
+    DEFAULT_PATH = Path.home() / ".classroom_utils" / "http_cache.sqlite3"
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+    # Seconds to wait for a write lock held by another process before giving up
+    LOCK_TIMEOUT = 5.0
+
+    def __init__(self, path: Path = DEFAULT_PATH, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=self.LOCK_TIMEOUT, check_same_thread=False)
+        # With a write-ahead log, readers don't block writers of parallel CLI runs, and the short transactions of
+        # every lookup don't sync the disk on commit (a crash might only lose the latest LRU updates)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._db.commit()
+        # The access sequence and the total size are only read once, instead of aggregating them on every request.
+        # Responses stored by parallel runs are counted again the next time the cache is opened.
+        self._last_access, self._total_size = self._db.execute(
+            "SELECT COALESCE(MAX(last_access), 0), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        logm.debug("Using HTTP cache '%s' (max size: %d bytes)", self.path, self.max_size)
+
+    @staticmethod
+    def create_key(url: str, authorization: str | None, accept: str | None) -> str:
+        # Responses depend on the credentials and media type, so both are part of the key. The token is hashed
+        # to avoid storing it in plain text.
+        identity = hashlib.sha256((authorization or "").encode("utf-8")).hexdigest()
+        return f"{identity}:{accept or ''}:{url}"
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT etag, last_modified, status_code, headers, body FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (self._next_access(), key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._db.rollback()
+                logm.warning("Ignoring HTTP cache, lookup failed: %s", e)
+                return None
+        etag, last_modified, status_code, headers, body = row
+        return CachedResponse(etag, last_modified, status_code, json.loads(headers), body)
+
+    def store(self, key: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return
+        body = response.content
+        if len(body) > self.max_size:
+            return
+
+        with self._lock:
+            try:
+                replaced_row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, etag, last_modified, response.status_code, json.dumps(dict(response.headers)), body,
+                     len(body), self._next_access())
+                )
+                total_size = self._evict(self._total_size + len(body) - (replaced_row[0] if replaced_row else 0))
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._db.rollback()
+                logm.warning("Ignoring HTTP cache, storing response failed: %s", e)
+                return
+            self._total_size = total_size
+
+    def _next_access(self) -> int:
+        # A persistent access sequence instead of timestamps keeps the LRU order independent of the clock resolution
+        self._last_access += 1
+        return self._last_access
+
+    def _evict(self, total_size: int) -> int:
+        if total_size <= self.max_size:
+            return total_size
+
+        evicted_keys = []
+        cursor = self._db.execute("SELECT key, size FROM responses ORDER BY last_access ASC")
+        for key, size in cursor:
+            if total_size <= self.max_size:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        cursor.close()
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted_keys)
+        logm.debug("Evicted %d responses from HTTP cache", len(evicted_keys))
+        return total_size
+
+    @staticmethod
+    def add_conditional_headers(headers: dict, cached_response: CachedResponse) -> None:
+        if cached_response.etag:
+            headers["If-None-Match"] = cached_response.etag
+        if cached_response.last_modified:
+            headers["If-Modified-Since"] = cached_response.last_modified
+
+    @staticmethod
+    def replay(cached_response: CachedResponse, not_modified_response: requests.Response) -> requests.Response:
+        response = requests.Response()
+        response.status_code = cached_response.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(cached_response.headers)
+        # Keep the fresh rate limit and date headers of the 304 response
+        response.headers.update(not_modified_response.headers)
+        response.headers.pop("Content-Length", None)
+        response._content = cached_response.body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = not_modified_response.url
+        response.request = not_modified_response.request
+        response.elapsed = not_modified_response.elapsed
+        response.reason = "OK"
+        setattr(response, "from_cache", True)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,44 @@
+# Copyright (C) 2024 twyleg
+import json
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, TypeVar
+
+
+# GitHub limits a single GraphQL query to a node count, 100 aliased user lookups stay well below it
+USER_BATCH_SIZE = 100
+
+T = TypeVar("T")
+
+
+class GithubGraphQLError(Exception):
+    pass
+
+
+class UserInfo(NamedTuple):
+    login: str
+    database_id: int
+    name: str | None
+
+
+def batched(items: Sequence[T], batch_size: int) -> Iterator[Sequence[T]]:
+    for i in range(0, len(items), batch_size):
+        yield items[i:i + batch_size]
+
+
+def build_users_query(logins: Sequence[str]) -> str:
+    fields = [f"u{i}: user(login: {json.dumps(login)}) {{ login databaseId name }}" for i, login in enumerate(logins)]
+    return "query { " + " ".join(fields) + " }"
+
+
+def parse_users_response(logins: Sequence[str], response: Dict[str, Any]) -> Dict[str, UserInfo | None]:
+    errors: List[Dict[str, Any]] = response.get("errors", [])
+    unexpected_errors = [error for error in errors if error.get("type") != "NOT_FOUND"]
+    if unexpected_errors:
+        raise GithubGraphQLError("; ".join(error.get("message", str(error)) for error in unexpected_errors))
+
+    data = response.get("data") or {}
+    user_infos: Dict[str, UserInfo | None] = {}
+    for i, login in enumerate(logins):
+        user = data.get(f"u{i}")
+        user_infos[login] = UserInfo(user["login"], user["databaseId"], user["name"]) if user else None
+    return user_infos
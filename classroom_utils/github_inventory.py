@@ -0,0 +1,205 @@
+# Copyright (C) 2024 twyleg
+import json
+import logging
+import threading
+import time
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from github.Invitation import Invitation
+from github.Organization import Organization
+from github.Permissions import Permissions
+from github.Repository import Repository
+
+from classroom_utils.github_graphql import UserInfo
+
+
+logm = logging.getLogger("github_inventory")
+
+
+def collaborator_permission(permissions: Permissions) -> str:
+    # Same mapping as the legacy "permission" field of GET /repos/{owner}/{repo}/collaborators/{username}/permission,
+    # derived from the "permissions" field that the collaborators listing already contains
+    if permissions.admin:
+        return "admin"
+    if permissions.maintain or permissions.push:
+        return "write"
+    if permissions.triage or permissions.pull:
+        return "read"
+    return "none"
+
+
+class OrgRepoIndex:
+
+    def __init__(self, org: Organization):
+        self.org = org
+        self._lock = threading.Lock()
+        self._repos_by_name: Dict[str, Repository] = {}
+
+        logm.debug("Indexing repos of org '%s'", org.login)
+        for repo in org.get_repos():
+            self._repos_by_name[self._key(repo.name)] = repo
+        logm.debug("Indexed %d repos of org '%s'", len(self._repos_by_name), org.login)
+
+    @staticmethod
+    def _key(repo_name: str) -> str:
+        # Repo names are case-insensitive on GitHub
+        return repo_name.lower()
+
+    def __contains__(self, repo_name: str) -> bool:
+        with self._lock:
+            return self._key(repo_name) in self._repos_by_name
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._repos_by_name)
+
+    def get(self, repo_name: str) -> Repository | None:
+        with self._lock:
+            return self._repos_by_name.get(self._key(repo_name))
+
+    def add(self, repo: Repository) -> None:
+        with self._lock:
+            self._repos_by_name[self._key(repo.name)] = repo
+
+    @property
+    def repos(self) -> List[Repository]:
+        with self._lock:
+            return list(self._repos_by_name.values())
+
+
+class RepoAccessSnapshot:
+
+    def __init__(self, repo: Repository):
+        self.repo = repo
+        self.collaborator_permissions: Dict[int, str] = {
+            collaborator.id: collaborator_permission(collaborator.permissions) for collaborator in repo.get_collaborators()
+        }
+        self.collaborator_ids: Set[int] = set(self.collaborator_permissions)
+        self.invitations_by_invitee_id: Dict[int, Invitation] = {
+            invitation.invitee.id: invitation for invitation in repo.get_pending_invitations()
+        }
+        logm.debug("Repo '%s' has %d collaborators and %d pending invitations", repo.full_name,
+                   len(self.collaborator_ids), len(self.invitations_by_invitee_id))
+
+    def is_collaborator(self, user_info: UserInfo) -> bool:
+        return user_info.database_id in self.collaborator_ids
+
+    def get_permission(self, user_info: UserInfo) -> str | None:
+        return self.collaborator_permissions.get(user_info.database_id)
+
+    def get_pending_invitation(self, user_info: UserInfo) -> Invitation | None:
+        return self.invitations_by_invitee_id.get(user_info.database_id)
+
+
+class UserCache:
+
+    DEFAULT_PATH = Path.home() / ".classroom_utils" / "user_cache.json"
+    # Logins can be renamed, so persisted resolutions expire after a week
+    DEFAULT_TTL = 7 * 24 * 60 * 60
+
+    def __init__(self, path: Path | None = None, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._users_by_login: Dict[str, Tuple[UserInfo, float]] = {}
+        self._users_by_id: Dict[int, UserInfo] = {}
+        self._modified = False
+
+        if self.path is not None and self.path.exists():
+            self._load(self.path)
+
+    @staticmethod
+    def _key(github_username: str) -> str:
+        # GitHub logins are case-insensitive
+        return github_username.lower()
+
+    def _load(self, path: Path) -> None:
+        try:
+            with open(path, encoding="utf-8") as user_cache_file:
+                entries = json.load(user_cache_file)
+        except (OSError, ValueError) as e:
+            logm.warning("Ignoring unreadable user cache '%s': %s", path, e)
+            return
+
+        now = time.time()
+        for entry in entries:
+            if now - entry["resolved_at"] < self.ttl:
+                self._add(UserInfo(entry["login"], entry["database_id"], entry["name"]), entry["resolved_at"])
+        logm.debug("Loaded %d users from user cache '%s'", len(self._users_by_login), path)
+
+    def _add(self, user_info: UserInfo, resolved_at: float) -> None:
+        self._users_by_login[self._key(user_info.login)] = (user_info, resolved_at)
+        self._users_by_id[user_info.database_id] = user_info
+
+    def add(self, user_info: UserInfo) -> None:
+        with self._lock:
+            self._add(user_info, time.time())
+            self._modified = True
+
+    def get(self, github_username: str) -> UserInfo | None:
+        with self._lock:
+            entry = self._users_by_login.get(self._key(github_username))
+        if entry is None or time.time() - entry[1] >= self.ttl:
+            return None
+        return entry[0]
+
+    def get_by_id(self, database_id: int) -> UserInfo | None:
+        with self._lock:
+            user_info = self._users_by_id.get(database_id)
+        return self.get(user_info.login) if user_info else None
+
+    def missing(self, github_usernames: Iterable[str]) -> List[str]:
+        return [github_username for github_username in github_usernames if self.get(github_username) is None]
+
+    def save(self) -> None:
+        if self.path is None or not self._modified:
+            return
+        with self._lock:
+            entries = [{"login": user_info.login, "database_id": user_info.database_id, "name": user_info.name,
+                        "resolved_at": resolved_at} for user_info, resolved_at in self._users_by_login.values()]
+            self._modified = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as user_cache_file:
+            json.dump(entries, user_cache_file, indent=2)
+
+
+class RootCommitCache:
+
+    DEFAULT_PATH = Path.home() / ".classroom_utils" / "root_commits.json"
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._root_commits: Dict[str, Dict[str, str]] = {}
+        self._modified = False
+
+        if self.path is not None and self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as root_commits_file:
+                    self._root_commits = json.load(root_commits_file)
+            except (OSError, ValueError) as e:
+                logm.warning("Ignoring unreadable root commit cache '%s': %s", self.path, e)
+
+    def get(self, full_repo_name: str, head_sha: str) -> str | None:
+        with self._lock:
+            entry = self._root_commits.get(full_repo_name.lower())
+        if entry is None or entry["head"] != head_sha:
+            return None
+        return entry["root"]
+
+    def add(self, full_repo_name: str, head_sha: str, root_sha: str) -> None:
+        with self._lock:
+            self._root_commits[full_repo_name.lower()] = {"head": head_sha, "root": root_sha}
+            self._modified = True
+
+    def save(self) -> None:
+        if self.path is None or not self._modified:
+            return
+        with self._lock:
+            root_commits = dict(self._root_commits)
+            self._modified = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as root_commits_file:
+            json.dump(root_commits, root_commits_file, indent=2)
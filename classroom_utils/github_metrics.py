@@ -0,0 +1,145 @@
+# Copyright (C) 2024 twyleg
+import bisect
+import json
+import logging
+import threading
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+
+logm = logging.getLogger("github_metrics")
+
+
+# Path segments following these keywords are parameters. "*" consumes the remaining path, e.g. of a git ref.
+PATH_PARAMETERS: Dict[str, List[str]] = {
+    "orgs": ["{org}"],
+    "users": ["{username}"],
+    "repos": ["{owner}", "{repo}"],
+    "collaborators": ["{username}"],
+    "invitations": ["{invitation_id}"],
+    "branches": ["{branch}"],
+    "pulls": ["{pull_number}"],
+    "commits": ["{ref}"],
+    "members": ["{username}"],
+    "memberships": ["{username}"],
+    "teams": ["{team_slug}"],
+    "refs": ["*"],
+}
+
+
+def endpoint_template(verb: str, url: str) -> str:
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    template: List[str] = []
+    index = 0
+    while index < len(segments):
+        segment = segments[index]
+        template.append(segment)
+        index += 1
+        for parameter in PATH_PARAMETERS.get(segment, []):
+            if index >= len(segments):
+                break
+            if parameter == "*":
+                template.append("{ref}")
+                index = len(segments)
+            else:
+                template.append(parameter)
+                index += 1
+    return f"{verb.upper()} /{'/'.join(template)}"
+
+
+class EndpointMetrics:
+
+    # Upper bounds of the latency histogram buckets in seconds, the last bucket collects everything slower
+    LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cached = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_histogram = [0] * (len(self.LATENCY_BUCKETS) + 1)
+
+    def record(self, status_code: int | None, latency: float, bytes_sent: int, bytes_received: int,
+               cached: bool) -> None:
+        self.calls += 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+        if cached:
+            self.cached += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+        self.latency_histogram[bisect.bisect_left(self.LATENCY_BUCKETS, latency)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        # Upper bound of the bucket containing the requested percentile, but never above the slowest request
+        rank = fraction * self.calls
+        count = 0
+        for bucket, bucket_count in enumerate(self.latency_histogram):
+            count += bucket_count
+            if count >= rank and bucket_count and bucket < len(self.LATENCY_BUCKETS):
+                return min(self.LATENCY_BUCKETS[bucket], self.max_latency)
+        return self.max_latency
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cached": self.cached,
+            "total_latency": self.total_latency,
+            "max_latency": self.max_latency,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_histogram": {
+                **{f"le_{bound}": count for bound, count in zip(self.LATENCY_BUCKETS, self.latency_histogram)},
+                "inf": self.latency_histogram[-1],
+            },
+        }
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+
+    def record(self, verb: str, url: str, status_code: int | None, latency: float, bytes_sent: int = 0,
+               bytes_received: int = 0, cached: bool = False) -> None:
+        template = endpoint_template(verb, url)
+        with self._lock:
+            endpoint_metrics = self.endpoints.setdefault(template, EndpointMetrics())
+            endpoint_metrics.record(status_code, latency, bytes_sent, bytes_received, cached)
+
+    @property
+    def calls(self) -> int:
+        with self._lock:
+            return sum(endpoint_metrics.calls for endpoint_metrics in self.endpoints.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {template: endpoint_metrics.to_dict() for template, endpoint_metrics in sorted(self.endpoints.items())}
+
+    def format_table(self) -> List[str]:
+        with self._lock:
+            rows = sorted(self.endpoints.items(), key=lambda item: item[1].total_latency, reverse=True)
+            width = max([len("Endpoint")] + [len(template) for template, _ in rows])
+            lines = [f"{'Endpoint':<{width}}  {'Calls':>6}  {'Errors':>6}  {'Cached':>6}  {'Total s':>8}  "
+                     f"{'p50 s':>6}  {'p95 s':>6}  {'Max s':>6}  {'KiB in':>8}  {'KiB out':>8}"]
+            for template, endpoint_metrics in rows:
+                lines.append(f"{template:<{width}}  {endpoint_metrics.calls:>6}  {endpoint_metrics.errors:>6}  "
+                             f"{endpoint_metrics.cached:>6}  {endpoint_metrics.total_latency:>8.2f}  "
+                             f"{endpoint_metrics.percentile(0.5):>6.2f}  {endpoint_metrics.percentile(0.95):>6.2f}  "
+                             f"{endpoint_metrics.max_latency:>6.2f}  {endpoint_metrics.bytes_received / 1024:>8.1f}  "
+                             f"{endpoint_metrics.bytes_sent / 1024:>8.1f}")
+            return lines
+
+    def write_json(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as metrics_file:
+            json.dump(self.to_dict(), metrics_file, indent=2)
+        logm.info("Wrote request metrics to '%s'", path)
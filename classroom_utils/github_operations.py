@@ -1,28 +1,42 @@
 # Copyright (C) 2024 twyleg
-import json
-import os
 import logging
+import math
 import sys
-import urllib.request
-import git
+import threading
+import time
 
 import github
+import github.Requester
 import github.NamedUser
 import github.GithubException
 import github.Organization
 import github.Repository
-import github.Branch
 import github.PullRequest
+import requests
 
-from typing import List, NamedTuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
 from pathlib import Path
-from requests.models import PreparedRequest
 
 from github.Organization import Organization
 from github.PaginatedList import PaginatedList
 from alive_progress import alive_bar
 
+from classroom_utils import profiling
+from classroom_utils.class_plan import CANCEL_INVITATION, CREATE_REPO, INVITE, REPLACE_INVITATION, REVOKE_ACCESS, \
+    UPDATE_PERMISSION, PlannedChange, log_plan, plan_member_changes
 from classroom_utils.classes import User, Classes, Member
+from classroom_utils.git_operations import BackupManifest, clone_repo, fetch_repo, update_object_store
+from classroom_utils.github_cache import HttpCache
+from classroom_utils.github_graphql import USER_BATCH_SIZE, UserInfo, batched, build_users_query, \
+    parse_users_response
+from classroom_utils.github_inventory import OrgRepoIndex, RepoAccessSnapshot, RootCommitCache, UserCache, \
+    collaborator_permission
+from classroom_utils.github_metrics import RequestMetrics
+from classroom_utils.github_session import GithubSession
+from classroom_utils.journal import OperationJournal
+from classroom_utils.repo_matching import PersonalRepoMatcher
 
 
 logm = logging.getLogger("github_operations")
@@ -33,34 +47,184 @@ class GithubCredentials(NamedTuple):
     token: str
 
 
+class MemberFailure(NamedTuple):
+    member: Member
+    error: Exception
+
+
+class RequestThrottle:
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_request_time = 0.0
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.min_interval
+        return max(delay, 0.0)
+
+    def wait(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def log_failure_summary(failures: List[MemberFailure]) -> None:
+    if not failures:
+        return
+    logm.error("Failed for %d class member(s):", len(failures))
+    for failure in failures:
+        logm.error("  - %s ('%s'): %s", failure.member.fullname, failure.member.github_username, failure.error)
+
+
 class GithubOperations:
 
-    def __init__(self, classes: Classes, github_credentials: GithubCredentials):
+    # GitHub's secondary rate limit allows at most 80 content-generating requests per minute
+    CONTENT_CREATION_REQUESTS_PER_MINUTE = 80
+    # PyGithub's pause between two writes, GitHub recommends at least a second between mutating requests
+    SECONDS_BETWEEN_WRITES: float | None = 1.0
+
+    PER_PAGE = 100
+
+    # Core API requests per member, used to warn before operations that exceed the remaining rate limit. User
+    # lookups are GraphQL queries with a rate limit of their own and are not counted.
+    # Repo creation: the creation itself
+    ESTIMATED_REQUESTS_PER_REPO_CREATION = 1
+    # Access change of a personal repo: collaborators and invitations of the repo, then the change itself
+    ESTIMATED_REQUESTS_PER_ACCESS_CHANGE = 3
+    # Review: review branch lookup, first and last page of the commits, review branch creation, pull request lookup,
+    # head branch lookup and pull request creation
+    ESTIMATED_REQUESTS_PER_REVIEW = 7
+
+    def __init__(self, classes: Classes, github_credentials: GithubCredentials, jobs: int = 1,
+                 http_cache: HttpCache | None = None, user_cache: UserCache | None = None,
+                 root_commit_cache: RootCommitCache | None = None, api_url: str = GithubSession.API_URL):
         self.classes = classes
         self.github_credentials = github_credentials
-        self.github_connection = github.Github(auth=github.Auth.Token(self.github_credentials.token))
-
-    def _validate_user(self, github_username: str) -> bool:
+        self.jobs = max(1, jobs)
+        self.content_creation_throttle = RequestThrottle(60.0 / self.CONTENT_CREATION_REQUESTS_PER_MINUTE)
+        self._lock = threading.Lock()
+        self._orgs: Dict[str, github.Organization.Organization] = {}
+        self._org_repo_indices: Dict[str, OrgRepoIndex] = {}
+        self.user_cache = user_cache if user_cache is not None else UserCache()
+        self.root_commit_cache = root_commit_cache if root_commit_cache is not None else RootCommitCache()
+        self._branch_shas: Dict[Tuple[str, str], str | None] = {}
+
+        # Raw REST/GraphQL calls and PyGithub share one pooled keep-alive session. The connection classes are injected
+        # process-wide, but every Requester binds them on construction, so resetting them right away keeps other
+        # Github instances (e.g. of other GithubOperations) on their own sessions. Only redirects, which PyGithub
+        # follows with the currently injected class, bypass the session.
+        self.github_session = GithubSession(self.github_credentials.token, pool_size=self.jobs, api_url=api_url,
+                                            http_cache=http_cache)
+        connection_class = self.github_session.create_connection_class()
+        # The connection class only duck-types PyGithub's, which are annotated as the expected parameter types
+        github.Requester.Requester.injectConnectionClasses(connection_class, connection_class)  # type: ignore[arg-type]
         try:
-            self.github_connection.get_user(github_username)
-            return True
-        except github.UnknownObjectException as e:
-            return False
-
-    def _validate_users(self, users: List[User]) -> None:
-        with alive_bar(len(users), title="Validating users:", enrich_print=False) as bar:
-            for user in users:
-                if self._validate_user(user.github_username):
-                    logm.info("  Valid: %s", user)
-                else:
-                    logm.warning("  Invalid: %s", user)
+            # Request pacing is left to the session's rate limit scheduler, only PyGithub's spacing of writes is kept
+            self.github_connection = github.Github(auth=github.Auth.Token(self.github_credentials.token),
+                                                   base_url=self.github_session.api_url, per_page=self.PER_PAGE,
+                                                   pool_size=self.github_session.pool_size,
+                                                   seconds_between_requests=None,
+                                                   seconds_between_writes=self.SECONDS_BETWEEN_WRITES)
+        finally:
+            github.Requester.Requester.resetConnectionClasses()
+
+    @contextmanager
+    def _progress_bar(self, total: int, title: str) -> Iterator[Callable[[], None]]:
+        with alive_bar(total, title=title, enrich_print=False) as bar:
+            @profiling.timed(profiling.PROGRESS_RENDERING)
+            def tick() -> None:
+                bar.text(self.github_session.scheduler.status_text())
                 bar()
+            yield tick
+
+    def _run_for_members(self, title: str, members: List[Member],
+                         operation: Callable[[Member], None]) -> List[MemberFailure]:
+        failures: List[MemberFailure] = []
+
+        with self._progress_bar(len(members), title) as bar:
+            executor = ThreadPoolExecutor(max_workers=self.jobs)
+            try:
+                futures = {executor.submit(operation, member): member for member in members}
+                for future in as_completed(futures):
+                    member = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logm.error("Operation failed for '%s' ('%s'): %s", member.fullname, member.github_username, e)
+                        failures.append(MemberFailure(member, e))
+                    bar()
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return failures
+
+    def _graphql_query(self, query: str) -> Dict:
+        return self.github_session.post_json(self.github_session.graphql_url, {"query": query})
+
+    def _resolve_users(self, github_usernames: List[str]) -> Dict[str, UserInfo | None]:
+        user_infos: Dict[str, UserInfo | None] = {}
+        for batch in batched(github_usernames, USER_BATCH_SIZE):
+            response = self._graphql_query(build_users_query(batch))
+            user_infos.update(parse_users_response(batch, response))
+        return user_infos
 
-    def _get_named_user(self, github_username: str) -> github.NamedUser.NamedUser:
-        return self.github_connection.get_user(github_username)
+    def _validate_users(self, users: List[User]) -> None:
+        invalid_users: List[User] = []
+
+        with self._progress_bar(len(users), "Validating users:") as bar:
+            for batch in batched(users, USER_BATCH_SIZE):
+                user_infos = self._resolve_users([user.github_username for user in batch])
+                for user in batch:
+                    user_info = user_infos[user.github_username]
+                    if user_info:
+                        self.user_cache.add(user_info)
+                        logm.info("  Valid: %s (id=%d, display_name='%s')", user, user_info.database_id, user_info.name)
+                    else:
+                        logm.warning("  Invalid: %s", user)
+                        invalid_users.append(user)
+                    bar()
+
+        self.user_cache.save()
+        if invalid_users:
+            logm.warning("Invalid GitHub usernames: %s", ", ".join(user.github_username for user in invalid_users))
+
+    def _prewarm_user_cache(self, users: Iterable[User]) -> None:
+        missing_github_usernames = self.user_cache.missing(user.github_username for user in users)
+        if not missing_github_usernames:
+            return
+        logm.debug("Resolving %d uncached GitHub users", len(missing_github_usernames))
+        for github_username, user_info in self._resolve_users(missing_github_usernames).items():
+            if user_info:
+                self.user_cache.add(user_info)
+            else:
+                logm.warning("Unknown GitHub user: '%s'", github_username)
+        self.user_cache.save()
+
+    def _get_user_info(self, github_username: str) -> UserInfo:
+        user_info = self.user_cache.get(github_username)
+        if user_info is None:
+            self._prewarm_user_cache([User("", "", github_username, True)])
+            user_info = self.user_cache.get(github_username)
+        if user_info is None:
+            raise github.UnknownObjectException(404, {"message": f"Unknown GitHub user '{github_username}'"}, None)
+        return user_info
 
     def _get_org(self, org_name: str) -> github.Organization.Organization:
-        return self.github_connection.get_organization(org_name)
+        with self._lock:
+            if org_name not in self._orgs:
+                self._orgs[org_name] = self.github_connection.get_organization(org_name)
+            return self._orgs[org_name]
+
+    def _get_org_repo_index(self, org_name: str) -> OrgRepoIndex:
+        org = self._get_org(org_name)
+        with self._lock:
+            if org_name not in self._org_repo_indices:
+                self._org_repo_indices[org_name] = OrgRepoIndex(org)
+            return self._org_repo_indices[org_name]
 
     def _get_orgs(self) -> PaginatedList[Organization]:
         return self.get_user().get_orgs()
@@ -76,129 +240,152 @@ class GithubOperations:
             logm.error("Repo '%s' is not a template! Unable to create personal class repos!", template_repo.name)
             sys.exit(-1)
 
-    def _is_repo_existing(self, full_repo_name: str) -> bool:
+    def _get_branch_sha(self, repo: github.Repository.Repository, name: str) -> str | None:
+        key = (repo.full_name.lower(), name)
+        with self._lock:
+            if key in self._branch_shas:
+                return self._branch_shas[key]
         try:
-            self.github_connection.get_repo(full_repo_name)
-            return True
-        except github.GithubException:
-            return False
-
-    @staticmethod
-    def _get_branch_by_name(repo: github.Repository.Repository, name: str) -> github.Branch.Branch | None:
-        for branch in repo.get_branches():
-            if branch.name == name:
-                return branch
-        return None
+            sha = repo.get_branch(name).commit.sha
+        except github.GithubException as e:
+            # Missing branches are reported as "Branch not found", which PyGithub doesn't map to UnknownObjectException
+            if e.status != 404:
+                raise
+            sha = None
+        self._remember_branch_sha(repo, name, sha)
+        return sha
+
+    def _remember_branch_sha(self, repo: github.Repository.Repository, name: str, sha: str | None) -> None:
+        with self._lock:
+            self._branch_shas[(repo.full_name.lower(), name)] = sha
 
     @staticmethod
-    def _get_pull_request_by_title(repo: github.Repository.Repository, title: str) -> github.PullRequest.PullRequest | None:
-        for pull in repo.get_pulls():
+    def _get_open_pull_request(repo: github.Repository.Repository, base: str, head: str,
+                               title: str) -> github.PullRequest.PullRequest | None:
+        for pull in repo.get_pulls(state="open", base=base, head=f"{repo.owner.login}:{head}"):
             if pull.title == title:
                 return pull
         return None
 
-    @staticmethod
-    def _repo_remove_invitation(repo: github.Repository.Repository, invitee: github.NamedUser.NamedUser) -> None:
-        logm.debug("Removing invitations in repo '%s' for user '%s'", repo.full_name, invitee.login)
-
-        pending_invitations = repo.get_pending_invitations()
-
-        for invitation in pending_invitations:
-            if invitation.invitee.login == invitee.login:
-                logm.debug("Found invitation: '%s'", invitation.invitee.login)
-                repo.remove_invitation(invitation.id)
-                return
-        logm.warning("Unable to find and remove invitation for '%s'", invitation.invitee.login)
-
-
-    @staticmethod
-    def _repo_is_invitation_for_user_pending(repo: github.Repository, user: github.NamedUser) -> bool:
-        pending_invitations = repo.get_pending_invitations()
-        for pending_invitation in pending_invitations:
-            if pending_invitation.invitee == user:
-                return True
-        return False
-
-    def _repo_create(self, org: Organization, member: Member, repo_prefix: str | None,
+    def _repo_create(self, org_name: str, member: Member, repo_prefix: str | None,
                      template_repo: github.Repository.Repository | None) -> None:
 
+        org = self._get_org(org_name)
+        repo_index = self._get_org_repo_index(org_name)
         repo_name = member.generate_personal_repo_name(repo_prefix)
         full_repo_name = f"{org.login}/{repo_name}"
-        if self._is_repo_existing(full_repo_name):
+        if repo_name in repo_index:
             logm.warning("Repo already existing: '%s'. Nothing todo!", full_repo_name)
         elif template_repo:
-            org.create_repo_from_template(repo_name, template_repo, private=True)
+            self.content_creation_throttle.wait()
+            repo_index.add(org.create_repo_from_template(repo_name, template_repo, private=True))
             logm.info("Created repo '%s' from template '%s'", full_repo_name, template_repo.full_name)
         else:
-            org.create_repo(repo_name, private=True, auto_init=True)
+            self.content_creation_throttle.wait()
+            repo_index.add(org.create_repo(repo_name, private=True, auto_init=True))
             logm.info("Created repo '%s'", full_repo_name)
 
-    def _repo_access_grant(self, repo: github.Repository.Repository, member: Member, permission: str = "pull"):
-        member_named_user = self._get_named_user(member.github_username)
-        if repo.has_in_collaborators(member_named_user):
+    def _repo_access_grant(self, repo: github.Repository.Repository, member: Member, permission: str = "pull",
+                           access_snapshot: RepoAccessSnapshot | None = None):
+        member_user = self._get_user_info(member.github_username)
+        access_snapshot = access_snapshot or RepoAccessSnapshot(repo)
+        if access_snapshot.is_collaborator(member_user):
             logm.warning("User already a collaborator of repo '%s' -> '%s' already pending. Nothing todo!", member, repo.full_name)
         else:
-            if self._repo_is_invitation_for_user_pending(repo, member_named_user):
+            pending_invitation = access_snapshot.get_pending_invitation(member_user)
+            if pending_invitation is not None:
                 logm.warning("Invitation already pending: '%s' -> '%s'. Inviting again!", member, repo.full_name)
-                self._repo_remove_invitation(repo, member_named_user)
-            repo.add_to_collaborators(member_named_user, permission=permission)
+                repo.remove_invitation(pending_invitation.id)
+            repo.add_to_collaborators(member_user.login, permission=permission)
             logm.info("Granted access to repo '%s' -> '%s', permission: '%s'", member, repo.full_name, permission)
 
-    def _repo_clone(self, clone_url: str, target_dir) -> None:
-
-        logm.debug("Clone URL: '%s'", clone_url)
-
-        os.environ["GIT_USERNAME"] = self.github_credentials.username
-        os.environ["GIT_PASSWORD"] = self.github_credentials.token
-        git.Repo.clone_from(clone_url, target_dir)
+    def _repo_access_revoke(self, repo: github.Repository.Repository, member: Member,
+                            access_snapshot: RepoAccessSnapshot | None = None) -> None:
+        member_user = self._get_user_info(member.github_username)
+        access_snapshot = access_snapshot or RepoAccessSnapshot(repo)
+        if access_snapshot.is_collaborator(member_user):
+            repo.remove_from_collaborators(member_user.login)
+        pending_invitation = access_snapshot.get_pending_invitation(member_user)
+        if pending_invitation is not None:
+            logm.debug("Removing invitation in repo '%s' for user '%s'", repo.full_name, member_user.login)
+            repo.remove_invitation(pending_invitation.id)
+
+    @property
+    def metrics(self) -> RequestMetrics:
+        return self.github_session.metrics
+
+    def log_metrics(self) -> None:
+        if not self.metrics.endpoints:
+            return
+        logm.info("GitHub requests: %d", self.metrics.calls)
+        for line in self.metrics.format_table():
+            logm.info("  %s", line)
+
+    def log_request_summary(self) -> None:
+        retry_policy = self.github_session.retry_policy
+        retry_reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(retry_policy.retry_counts.items()))
+        logm.info("Retried GitHub requests: %d%s, rate limited: %d", retry_policy.retry_count,
+                  f" ({retry_reasons})" if retry_reasons else "", self.github_session.scheduler.throttle_count)
+
+    def log_quota_usage(self) -> None:
+        scheduler = self.github_session.scheduler
+        for resource, used in sorted(scheduler.quota_usage().items()):
+            quota = scheduler.quotas[resource]
+            logm.info("Rate limit '%s': used %d, remaining %d/%d, reset at %s", resource, used, quota.remaining,
+                      quota.limit, time.strftime("%H:%M:%S", time.localtime(quota.reset)))
+
+    def _estimate_shared_repo_access_cost(self, member_count: int) -> int:
+        # The repo lookup, a page of collaborators and of invitations per PER_PAGE members and a change per member
+        listing_pages = max(1, math.ceil(member_count / self.PER_PAGE))
+        return 1 + 2 * listing_pages + member_count
+
+    def _preflight_quota_check(self, description: str, estimated_cost: int) -> None:
+        # Querying the rate limit status does not count against the rate limit. The check is only advisory, so a
+        # failing query (e.g. on GitHub Enterprise Server with rate limiting disabled) never stops the operation.
+        try:
+            core = self.github_session.get_json("/rate_limit")["resources"]["core"]
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+            logm.debug("%s: skipping the rate limit check: %s", description, e)
+            return
+        logm.debug("%s: about %d API requests, %d/%d remaining", description, estimated_cost, core["remaining"],
+                   core["limit"])
+        if estimated_cost > core["remaining"]:
+            logm.warning("%s needs about %d API requests, but only %d of %d remain until %s. The operation will pause "
+                         "when the rate limit is exhausted.", description, estimated_cost, core["remaining"],
+                         core["limit"], time.strftime("%H:%M:%S", time.localtime(core["reset"])))
 
     def get_org_names(self) -> List[str]:
 
         org_names: List[str] = []
 
         params = {
-            "per_page": "100",
+            "per_page": self.PER_PAGE,
             "sort": "full_name",
             "page": 1
         }
 
         while True:
-            url = "https://api.github.com/user/orgs"
-
-            req_prep = PreparedRequest()
-            req_prep.prepare_url(url, params)
-
+            data_dict = self.github_session.get_json("/user/orgs", params)
             params["page"] += 1
 
-            req = urllib.request.Request(url=req_prep.url, method="GET")
-
-            req.add_header("Accept", "application/vnd.github+json")
-            req.add_header("Authorization", f"Bearer {self.github_credentials.token}")
-            req.add_header("X-GitHub-Api-Version", "2022-11-28")
-            with urllib.request.urlopen(req) as res:
-                data = res.read()
-                data_dict = json.loads(data)
-
-                for org in data_dict:
-                    org_names.append(org["login"])
-            if len(data_dict) == 0:
+            for org in data_dict:
+                org_names.append(org["login"])
+            if len(data_dict) < self.PER_PAGE:
                 return org_names
 
     def get_repo_names_by_org(self, org_name: str) -> List[str]:
-        org = self._get_org(org_name)
-        repos = org.get_repos(sort="name")
-        return [repo.name for repo in repos]
+        repo_index = self._get_org_repo_index(org_name)
+        return sorted(repo.name for repo in repo_index.repos)
 
     def get_full_repo_names_by_org(self, org_name: str) -> List[str]:
-        org = self._get_org(org_name)
-        repos = org.get_repos(sort="full_name")
-        return [repo.full_name for repo in repos]
+        repo_index = self._get_org_repo_index(org_name)
+        return sorted(repo.full_name for repo in repo_index.repos)
 
     def get_user(self) -> github.NamedUser.NamedUser:
         return self.github_connection.get_user()
 
     def get_user_info(self, github_username: str) -> None:
-        github_user = self._get_named_user(github_username)
+        github_user = self._get_user_info(github_username)
         logm.info("Name: %s", github_user.name)
         logm.info("GitHub username: %s", github_user.login)
         logm.info("Orgs:")
@@ -214,21 +401,93 @@ class GithubOperations:
         logm.info("Members:")
         self._validate_users(class_to_validate.members)
 
-    def org_create_personal_repos(self, org_name: str, class_name: str, repo_prefix: str | None, template_repo_full_name: str | None) -> None:
+    def org_create_personal_repos(self, org_name: str, class_name: str, repo_prefix: str | None,
+                                  template_repo_full_name: str | None, resume: bool = False) -> None:
         logm.info("Create class repos in org '%s' for class '%s'", org_name, class_name)
 
         selected_class = self.classes.get_class(class_name)
-        org = self._get_org(org_name)
-        template_repo = self._get_template_repo(template_repo_full_name) if template_repo_full_name else None
+        journal = OperationJournal("org_create_personal_repos", {"org_name": org_name, "class_name": class_name,
+                                                                 "repo_prefix": repo_prefix,
+                                                                 "template": template_repo_full_name}, resume)
+
+        for class_member in selected_class.inactive_members:
+            logm.info("Skipping repo creation of '%s' due to inactivity of class member", class_member.fullname)
+
+        pending_members = [class_member for class_member in selected_class.active_members
+                           if not journal.is_completed(class_member.github_username)]
+        template_repo = None
+        if pending_members:
+            self._preflight_quota_check("Creating personal repos",
+                                        len(pending_members) * self.ESTIMATED_REQUESTS_PER_REPO_CREATION)
+            template_repo = self._get_template_repo(template_repo_full_name) if template_repo_full_name else None
+            self._get_org_repo_index(org_name)
+
+        def create_repo(class_member: Member) -> None:
+            self._repo_create(org_name, class_member, repo_prefix, template_repo)
+            journal.complete(class_member.github_username)
+
+        failures = self._run_for_members("Creating personal repo:", pending_members, create_repo)
+        log_failure_summary(failures)
+        if not failures:
+            journal.finish()
+
+    def _get_root_commit_sha(self, repo: github.Repository.Repository) -> str:
+        # With one commit per page the first page holds HEAD and the last page holds the root commit,
+        # so the root is found with at most two requests regardless of the history length.
+        commits_url = f"/repos/{repo.full_name}/commits"
+        response = self.github_session.request("GET", commits_url, params={"per_page": 1})
+        response.raise_for_status()
+        head_sha = response.json()[0]["sha"]
+
+        root_sha = self.root_commit_cache.get(repo.full_name, head_sha)
+        if root_sha is not None:
+            return root_sha
+
+        last_page = response.links.get("last")
+        if last_page is None:
+            root_sha = head_sha
+        else:
+            response = self.github_session.request("GET", last_page["url"])
+            response.raise_for_status()
+            root_sha = response.json()[-1]["sha"]
 
-        with alive_bar(len(selected_class.members), title="Creating personal repo:", enrich_print=False) as bar:
-            for class_member in selected_class.active_members:
-                self._repo_create(org, class_member, repo_prefix, template_repo)
-                bar()
+        self.root_commit_cache.add(repo.full_name, head_sha, root_sha)
+        return root_sha
 
-            for class_member in selected_class.inactive_members:
-                logm.info("Skipping repo creation of '%s' due to inactivity of class member", class_member.fullname)
-                bar()
+    def _repo_review_create(self, repo: github.Repository.Repository, head_branch_name: str, review_branch_name: str,
+                            pr_title: str) -> None:
+        logm.info("Repo: '%s'", repo.full_name)
+
+        if self._get_branch_sha(repo, review_branch_name) is None:
+            first_commit_sha = self._get_root_commit_sha(repo)
+
+            repo.create_git_ref(f'refs/heads/{review_branch_name}', first_commit_sha)
+            self._remember_branch_sha(repo, review_branch_name, first_commit_sha)
+            logm.info("Created '%s' branch from first commit ('%s')", review_branch_name, first_commit_sha)
+        else:
+            logm.warning("Branch '%s' already existing in repo '%s'!", review_branch_name, repo.name)
+
+        if self._get_open_pull_request(repo, review_branch_name, head_branch_name, pr_title) is not None:
+            logm.warning("Pull-Request with '%s' already existing in repo '%s'!", review_branch_name, repo.name)
+            return
+
+        base_branch_sha = self._get_branch_sha(repo, review_branch_name)
+        head_branch_sha = self._get_branch_sha(repo, head_branch_name)
+
+        if head_branch_sha is None:
+            logm.warning("Unable to create PR! Head branch '%s' not found in repo '%s'.", head_branch_name, repo.name)
+            return
+
+        if base_branch_sha == head_branch_sha:
+            logm.warning("Unable to create PR! Base branch '%s' and head branch '%s' are equal.",
+                         review_branch_name, head_branch_name)
+            return
+        try:
+            repo.create_pull(review_branch_name, head_branch_name, title=pr_title)
+            logm.info("Created pullrequest '%s' <- '%s' in repository '%s'", review_branch_name,
+                      head_branch_name, repo.name)
+        except github.GithubException as e:
+            logm.error("Create pullrequest failed with message: '%s'", e.message)
 
     def org_reviews_create(self, org_name: str, class_name: str, head_branch_name: str, review_branch_name: str) -> None:
 
@@ -236,81 +495,77 @@ class GithubOperations:
 
         selected_class = self.classes.get_class(class_name)
 
-        org = self._get_org(org_name)
-        repos = org.get_repos()
+        repos = self._get_org_repo_index(org_name).repos
 
         pr_title = "Review"
 
         active_members = list(selected_class.active_members)
+        personal_repos = PersonalRepoMatcher(active_members).match(repos)
+        self._preflight_quota_check("Creating reviews", len(active_members) * self.ESTIMATED_REQUESTS_PER_REVIEW)
 
-        with alive_bar(len(active_members), title="Cloning repos:", enrich_print=False) as bar:
+        with self._progress_bar(len(active_members), "Creating reviews:") as bar:
             for class_member in active_members:
 
                 logm.info("Class member: '%s'", class_member)
 
-                repo = class_member.find_personal_repo(repos)
+                matching_repos = personal_repos[class_member]
 
-                if repo is None:
+                if not matching_repos:
                     logm.warning("Failed to create review for '%s' ('%s')! Unable to find repo in org '%s'",
                                  class_member.fullname, class_member.github_username, org_name)
-                    continue
-
-                logm.info("Repo: '%s'", repo.full_name)
-
-                if self._get_branch_by_name(repo, review_branch_name) is None:
-                    commit_history = repo.get_commits().reversed
-                    first_commit = commit_history[0]
-
-                    repo.create_git_ref(f'refs/heads/{review_branch_name}', first_commit.sha)
-                    logm.info("Created '%s' branch from first commit ('%s')", review_branch_name, first_commit)
                 else:
-                    logm.warning("Branch '%s' already existing in repo '%s'!", review_branch_name, repo.name)
-
-                if self._get_pull_request_by_title(repo, pr_title) is not None:
-                    logm.warning("Pull-Request with '%s' already existing in repo '%s'!", review_branch_name, repo.name)
-                    continue
-
-                base_branch = self._get_branch_by_name(repo, review_branch_name)
-                head_branch = self._get_branch_by_name(repo, head_branch_name)
+                    self._repo_review_create(matching_repos[0], head_branch_name, review_branch_name, pr_title)
+                bar()
 
-                if base_branch.commit.sha == head_branch.commit.sha:
-                    logm.warning("Unable to create PR! Base branch '%s' and head branch '%s' are equal.",
-                                    base_branch.name, head_branch.name)
-                    continue
-                try:
-                    repo.create_pull(review_branch_name, head_branch_name, title=pr_title)
-                    logm.info("Created pullrequest '%s' <- '%s' in repository '%s'", review_branch_name,
-                              head_branch_name, repo.name)
-                except github.GithubException as e:
-                    logm.error("Create pullrequest failed with message: '$s'", e.message)
-            bar()
+        self.root_commit_cache.save()
 
     def org_access_grant_personal_repos(self, org_name: str, selected_class_members: List[Member],
-                                        permission: str) -> None:
+                                        permission: str, resume: bool = False) -> None:
         logm.info("Grant access to personal class repos in org '%s' for the following class members:", org_name)
-        org = self._get_org(org_name)
-
-        with alive_bar(len(selected_class_members), title="Granting access:", enrich_print=False) as bar:
-            for class_member in selected_class_members:
+        journal = OperationJournal("org_access_grant_personal_repos", {"org_name": org_name, "permission": permission},
+                                   resume)
+        pending_members = [class_member for class_member in selected_class_members
+                           if not journal.is_completed(class_member.github_username)]
+        if not pending_members:
+            journal.finish()
+            return
+        self._preflight_quota_check("Granting access",
+                                    len(pending_members) * self.ESTIMATED_REQUESTS_PER_ACCESS_CHANGE)
+        repo_index = self._get_org_repo_index(org_name)
+        self._prewarm_user_cache(pending_members)
+
+        completed = True
+        with self._progress_bar(len(pending_members), "Granting access:") as bar:
+            for class_member in pending_members:
                 repo_name = class_member.generate_personal_repo_name()
-                repo = org.get_repo(repo_name)
-                self._repo_access_grant(repo, class_member, permission)
+                repo = repo_index.get(repo_name)
+                if repo is None:
+                    logm.error("Unable to grant access for '%s'. Repo '%s' not found in org '%s'", class_member,
+                               repo_name, org_name)
+                    completed = False
+                else:
+                    self._repo_access_grant(repo, class_member, permission)
+                    journal.complete(class_member.github_username)
                 bar()
+        if completed:
+            journal.finish()
 
     def org_access_revoke_personal_repos(self, org_name: str, selected_class_members: List[Member], ) -> None:
         logm.info("Revoke access from personal class repos in org '%s' for the following class members:'", org_name)
 
-        org = self._get_org(org_name)
+        self._preflight_quota_check("Revoking access",
+                                    len(selected_class_members) * self.ESTIMATED_REQUESTS_PER_ACCESS_CHANGE)
+        repo_index = self._get_org_repo_index(org_name)
+        self._prewarm_user_cache(selected_class_members)
 
         for class_member in selected_class_members:
             repo_name = class_member.generate_personal_repo_name()
-            class_member_named_user = self._get_named_user(class_member.github_username)
+            repo = repo_index.get(repo_name)
+            if repo is None:
+                logm.error("Unable to revoke access for '%s'. Repo not found in org '%s'", repo_name, org_name)
+                continue
             try:
-                repo = org.get_repo(repo_name)
-                repo.remove_from_collaborators(class_member_named_user)
-
-                self._repo_remove_invitation(repo, class_member_named_user)
-
+                self._repo_access_revoke(repo, class_member)
                 logm.info("Revoked access from personal class repo '%s' for '%s'", repo.full_name, class_member)
             except github.UnknownObjectException as e:
                 logm.error("%s", e)
@@ -320,25 +575,33 @@ class GithubOperations:
         logm.info("Grant class access to repo '%s' with permission '%s' for the following class members:",
                   full_repo_name, permission)
 
+        # Collaborators and invitations are read once for all members
+        self._preflight_quota_check("Changing access",
+                                    self._estimate_shared_repo_access_cost(len(selected_class_members)))
         repo = self._get_repo(full_repo_name)
+        self._prewarm_user_cache(selected_class_members)
+        access_snapshot = RepoAccessSnapshot(repo)
 
-        with alive_bar(len(selected_class_members), title="Granting access:", enrich_print=False) as bar:
+        with self._progress_bar(len(selected_class_members), "Granting access:") as bar:
             for class_member in selected_class_members:
                 logm.info("Granting access for '%s' to repo '%s' with permission: '%s'", class_member, repo.full_name, permission)
-                self._repo_access_grant(repo, class_member, permission)
+                self._repo_access_grant(repo, class_member, permission, access_snapshot)
                 bar()
 
     def repo_access_revoke_for_class(self, full_repo_name: str, selected_class_members: List[Member], ) -> None:
         logm.info("Revoke class access from repo '%s' for the following class members.", full_repo_name)
 
+        # Collaborators and invitations are read once for all members
+        self._preflight_quota_check("Changing access",
+                                    self._estimate_shared_repo_access_cost(len(selected_class_members)))
         repo = self._get_repo(full_repo_name)
+        self._prewarm_user_cache(selected_class_members)
+        access_snapshot = RepoAccessSnapshot(repo)
 
-        with alive_bar(len(selected_class_members), title="Revoke access:", enrich_print=False) as bar:
+        with self._progress_bar(len(selected_class_members), "Revoke access:") as bar:
             for class_member in selected_class_members:
-                class_member_named_user = self._get_named_user(class_member.github_username)
                 try:
-                    repo.remove_from_collaborators(class_member_named_user)
-                    self._repo_remove_invitation(repo, class_member_named_user)
+                    self._repo_access_revoke(repo, class_member, access_snapshot)
 
                     logm.info("Revoked access from repo '%s' for user '%s'", repo.full_name, class_member)
                 except github.UnknownObjectException as e:
@@ -346,6 +609,83 @@ class GithubOperations:
                     logm.error("Unable to revoke access from repo '%s' for user '%s'", repo.full_name, class_member)
                 bar()
 
+    def _snapshot_repo_access(self, repos: List[github.Repository.Repository]) -> Dict[str, RepoAccessSnapshot]:
+        access_snapshots: Dict[str, RepoAccessSnapshot] = {}
+        with self._progress_bar(len(repos), "Reading repo access:") as bar:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                for access_snapshot in executor.map(RepoAccessSnapshot, repos):
+                    access_snapshots[access_snapshot.repo.name.lower()] = access_snapshot
+                    bar()
+        return access_snapshots
+
+    def class_plan(self, org_name: str, class_name: str, repo_prefix: str | None,
+                   permission: str) -> List[PlannedChange]:
+        logm.info("Planning changes in org '%s' for class '%s'", org_name, class_name)
+
+        selected_class = self.classes.get_class(class_name)
+        repo_index = self._get_org_repo_index(org_name)
+        self._prewarm_user_cache(selected_class.members)
+
+        personal_repos = {}
+        for member in selected_class.members:
+            repo_name = member.generate_personal_repo_name(repo_prefix)
+            repo = repo_index.get(repo_name)
+            if repo is not None:
+                personal_repos[repo_name.lower()] = repo
+        access_snapshots = self._snapshot_repo_access(list(personal_repos.values()))
+
+        changes: List[PlannedChange] = []
+        for member in selected_class.members:
+            user_info = self.user_cache.get(member.github_username)
+            if user_info is None:
+                logm.error("Skipping '%s': unknown GitHub user '%s'", member.fullname, member.github_username)
+                continue
+            repo_name = member.generate_personal_repo_name(repo_prefix)
+            changes.extend(plan_member_changes(member, repo_name, user_info, access_snapshots.get(repo_name.lower()),
+                                               permission))
+
+        log_plan(changes)
+        return changes
+
+    def _apply_change(self, org_name: str, change: PlannedChange, repo_prefix: str | None,
+                      template_repo: github.Repository.Repository | None) -> None:
+        if change.action == CREATE_REPO:
+            self._repo_create(org_name, change.member, repo_prefix, template_repo)
+            return
+
+        repo = self._get_org_repo_index(org_name).get(change.repo_name)
+        if repo is None:
+            raise github.UnknownObjectException(404, {"message": f"Unknown repo '{change.repo_name}'"}, None)
+        login = self._get_user_info(change.member.github_username).login
+        if change.action in (CANCEL_INVITATION, REPLACE_INVITATION) and change.invitation_id is not None:
+            repo.remove_invitation(change.invitation_id)
+        if change.action in (INVITE, REPLACE_INVITATION, UPDATE_PERMISSION) and change.permission is not None:
+            repo.add_to_collaborators(login, permission=change.permission)
+        elif change.action == REVOKE_ACCESS:
+            repo.remove_from_collaborators(login)
+        logm.info("Applied %s", change)
+
+    def class_apply(self, org_name: str, class_name: str, repo_prefix: str | None, template_repo_full_name: str | None,
+                    permission: str) -> None:
+        changes = self.class_plan(org_name, class_name, repo_prefix, permission)
+        if not changes:
+            return
+
+        self._preflight_quota_check("Applying plan", sum(change.cost for change in changes))
+        template_repo = self._get_template_repo(template_repo_full_name) if template_repo_full_name else None
+        changes_by_member: Dict[Member, List[PlannedChange]] = {}
+        for change in changes:
+            changes_by_member.setdefault(change.member, []).append(change)
+
+        def apply_member_changes(member: Member) -> None:
+            # The changes of a member depend on each other (e.g. invite after repo creation), so they are applied
+            # in order while different members are processed in parallel
+            for member_change in changes_by_member[member]:
+                self._apply_change(org_name, member_change, repo_prefix, template_repo)
+
+        failures = self._run_for_members("Applying plan:", list(changes_by_member), apply_member_changes)
+        log_failure_summary(failures)
+
     def repo_print_details(self, full_repo_name: str) -> None:
         repo = self._get_repo(full_repo_name)
 
@@ -361,22 +701,82 @@ class GithubOperations:
         logm.info("  - Collaborators:")
         collaborators = repo.get_collaborators()
         for collaborator in collaborators:
-            collaborator_permission = repo.get_collaborator_permission(collaborator)
-            logm.info("    - %s: %s", collaborator.login, collaborator_permission)
+            logm.info("    - %s: %s", collaborator.login, collaborator_permission(collaborator.permissions))
 
-    def clone_org(self, org_name: str, working_dir: Path) -> None:
+    OBJECT_STORE_DIR_NAME = ".objects.git"
+
+    def clone_org(self, org_name: str, working_dir: Path, timeout: float | None = None, retries: int = 0,
+                  incremental: bool = False, reference_repo_full_name: str | None = None) -> List[str]:
         logm.info("Cloning all repos of org '%s'", org_name)
 
         backup_dir = working_dir / org_name
-        backup_dir.mkdir(exist_ok=False)
-
-        org = self._get_org(org_name)
-        repos = org.get_repos()
-
-        with alive_bar(repos.totalCount, title="Cloning repos:", enrich_print=False) as bar:
-            for repo in repos:
-                backup_repo_dir = backup_dir / repo.name
-                logm.info("Cloning repo '%s' -> '%s'", repo.clone_url, backup_repo_dir)
-                backup_repo_dir.mkdir()
-                self._repo_clone(repo.clone_url, backup_repo_dir)
-                bar()
+        backup_dir.mkdir(exist_ok=incremental)
+        manifest = BackupManifest(backup_dir)
+
+        repos = self._get_org_repo_index(org_name).repos
+        for repo_name in manifest.remove_missing(repo.name for repo in repos):
+            logm.warning("Repo '%s' was removed from org '%s', keeping its backup", repo_name, org_name)
+
+        repos_to_sync: List[Tuple[github.Repository.Repository, str | None]] = []
+        for repo in repos:
+            pushed_at = repo.pushed_at.isoformat() if repo.pushed_at else None
+            if (backup_dir / repo.name / ".git").is_dir() and manifest.is_up_to_date(repo.name, pushed_at):
+                logm.debug("Repo '%s' is up to date", repo.full_name)
+            else:
+                repos_to_sync.append((repo, pushed_at))
+        logm.info("Syncing %d of %d repos", len(repos_to_sync), len(repos))
+
+        failed_repo_names: List[str] = []
+        with self._progress_bar(len(repos_to_sync), "Cloning repos:") as bar:
+            # The workers only wait for git subprocesses, so threads suffice and nothing gets forked while the progress
+            # bar's render thread is running
+            executor = ThreadPoolExecutor(max_workers=self.jobs)
+            try:
+                object_store_dir = None
+                if reference_repo_full_name and repos_to_sync:
+                    object_store_dir = backup_dir / self.OBJECT_STORE_DIR_NAME
+                    try:
+                        reference_repo = self._get_repo(reference_repo_full_name)
+                        logm.info("Updating shared object store '%s' from '%s'", object_store_dir,
+                                  reference_repo.clone_url)
+                        executor.submit(update_object_store, reference_repo.clone_url, object_store_dir,
+                                        self.github_credentials.username, self.github_credentials.token,
+                                        timeout, retries).result()
+                    except Exception as e:
+                        # The object store only saves disk space, so the repos are cloned without it instead
+                        logm.error("Unable to update shared object store from '%s', cloning without it: %s",
+                                   reference_repo_full_name, e)
+                        object_store_dir = None
+
+                futures = {}
+                for repo, pushed_at in repos_to_sync:
+                    backup_repo_dir = backup_dir / repo.name
+                    if (backup_repo_dir / ".git").is_dir():
+                        logm.info("Fetching repo '%s' -> '%s'", repo.clone_url, backup_repo_dir)
+                        future = executor.submit(fetch_repo, backup_repo_dir, self.github_credentials.username,
+                                                 self.github_credentials.token, timeout, retries, repo.default_branch)
+                    else:
+                        logm.info("Cloning repo '%s' -> '%s'", repo.clone_url, backup_repo_dir)
+                        future = executor.submit(clone_repo, repo.clone_url, backup_repo_dir,
+                                                 self.github_credentials.username, self.github_credentials.token,
+                                                 timeout, retries, object_store_dir)
+                    futures[future] = (repo, pushed_at)
+                for future in as_completed(futures):
+                    repo, pushed_at = futures[future]
+                    try:
+                        attempts = future.result()
+                        logm.debug("Synced repo '%s' (attempts: %d)", repo.full_name, attempts)
+                        manifest.update(repo.name, pushed_at)
+                    except Exception as e:
+                        logm.error("Unable to sync repo '%s': %s", repo.full_name, e)
+                        failed_repo_names.append(repo.full_name)
+                    bar()
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+                manifest.save()
+
+        if failed_repo_names:
+            logm.error("Failed to sync %d of %d repos:", len(failed_repo_names), len(repos_to_sync))
+            for repo_name in sorted(failed_repo_names):
+                logm.error("  %s", repo_name)
+        return sorted(failed_repo_names)
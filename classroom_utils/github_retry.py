@@ -0,0 +1,54 @@
+# Copyright (C) 2024 twyleg
+import logging
+import random
+import threading
+
+from typing import Dict
+
+
+logm = logging.getLogger("github_retry")
+
+
+class RetryPolicy:
+
+    RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+    IDEMPOTENT_VERBS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_idempotent(cls, verb: str, url: str) -> bool:
+        # Only GraphQL queries are sent, so repeating a GraphQL request never changes anything
+        return verb.upper() in cls.IDEMPOTENT_VERBS or url.rstrip("/").endswith("/graphql")
+
+    def retry_reason_for_status(self, verb: str, url: str, status_code: int) -> str | None:
+        # A failed POST might still have created something (e.g. a repo), so it is not repeated blindly
+        if status_code in self.RETRYABLE_STATUS_CODES and self.is_idempotent(verb, url):
+            return f"HTTP {status_code}"
+        return None
+
+    def retry_reason_for_error(self, verb: str, url: str, request_sent: bool) -> str | None:
+        # Requests that never reached the server can be repeated regardless of their verb
+        if not request_sent:
+            return "connection failed"
+        if self.is_idempotent(verb, url):
+            return "connection lost"
+        return None
+
+    def next_delay(self, attempt: int, reason: str) -> float | None:
+        if attempt >= self.max_attempts:
+            return None
+        with self._lock:
+            self.retry_counts[reason] = self.retry_counts.get(reason, 0) + 1
+        # Exponential backoff with full jitter, so parallel workers don't retry in lockstep
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    @property
+    def retry_count(self) -> int:
+        with self._lock:
+            return sum(self.retry_counts.values())
@@ -0,0 +1,148 @@
+# Copyright (C) 2024 twyleg
+import logging
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Tuple
+
+
+logm = logging.getLogger("github_scheduler")
+
+
+class Quota(NamedTuple):
+    resource: str
+    limit: int
+    remaining: int
+    used: int
+    reset: float
+
+
+class RateLimitScheduler:
+
+    # GitHub asks to wait at least a minute after hitting a secondary rate limit without Retry-After header
+    SECONDARY_RATE_LIMIT_BACKOFF = 60.0
+
+    def __init__(self, max_concurrency: int = 1):
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.quotas: Dict[str, Quota] = {}
+        self._used_by_window: Dict[Tuple[str, float], List[int]] = {}
+        self.throttle_count = 0
+        self._active = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while True:
+                delay = self._paused_until - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                elif self._active >= self.concurrency:
+                    self._condition.wait()
+                else:
+                    self._active += 1
+                    return
+
+    def release(self) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def pause_delay(self) -> float:
+        with self._condition:
+            return max(self._paused_until - time.time(), 0.0)
+
+    @staticmethod
+    def is_rate_limited(status_code: int, headers: Mapping[str, str], text: str) -> bool:
+        if status_code not in (403, 429):
+            return False
+        if headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in headers:
+            return True
+        # Older secondary rate limit responses talk about abuse detection instead of rate limits
+        return "rate limit" in text.lower() or "abuse" in text.lower()
+
+    def _update_quota(self, headers: Mapping[str, str]) -> Quota | None:
+        if "X-RateLimit-Remaining" not in headers:
+            return None
+        quota = Quota(
+            resource=headers.get("X-RateLimit-Resource", "core"),
+            limit=int(headers.get("X-RateLimit-Limit", 0)),
+            remaining=int(headers["X-RateLimit-Remaining"]),
+            used=int(headers.get("X-RateLimit-Used", 0)),
+            reset=float(headers.get("X-RateLimit-Reset", 0)),
+        )
+        self.quotas[quota.resource] = quota
+        self._record_usage(quota)
+        return quota
+
+    def _record_usage(self, quota: Quota) -> None:
+        # Responses of parallel requests arrive out of order, so the usage of every rate limit window is derived from
+        # the lowest and highest "used" counter seen in that window
+        window = self._used_by_window.setdefault((quota.resource, quota.reset), [quota.used, quota.used])
+        window[0] = min(window[0], quota.used)
+        window[1] = max(window[1], quota.used)
+
+    def quota_usage(self) -> Dict[str, int]:
+        with self._condition:
+            usage: Dict[str, int] = {}
+            for (resource, _), (min_used, max_used) in self._used_by_window.items():
+                # The first response of a window already counts the request it answered
+                usage[resource] = usage.get(resource, 0) + max_used - min_used + 1
+            return usage
+
+    def _pause(self, until: float, reason: str) -> None:
+        if until > self._paused_until:
+            self._paused_until = until
+            logm.warning("%s, pausing GitHub requests for %.0fs", reason, until - time.time())
+
+    def update(self, status_code: int, headers: Mapping[str, str], text: str = "") -> bool:
+        with self._condition:
+            quota = self._update_quota(headers)
+            now = time.time()
+
+            if self.is_rate_limited(status_code, headers, text):
+                retry_after = headers.get("Retry-After")
+                if retry_after is not None:
+                    self._pause(now + float(retry_after), "Rate limited (Retry-After)")
+                elif quota is not None and quota.remaining == 0:
+                    self._pause(quota.reset + 1.0, f"Primary rate limit of '{quota.resource}' exhausted")
+                else:
+                    self._pause(now + self.SECONDARY_RATE_LIMIT_BACKOFF, "Secondary rate limit hit")
+                # Multiplicative decrease of the allowed concurrency
+                self.concurrency = max(1, self.concurrency // 2)
+                self._successes = 0
+                self.throttle_count += 1
+                self._condition.notify_all()
+                return True
+
+            if quota is not None and quota.remaining == 0:
+                self._pause(quota.reset + 1.0, f"Primary rate limit of '{quota.resource}' exhausted")
+            elif status_code < 400:
+                # Additive increase once a full window of requests succeeded
+                self._successes += 1
+                if self.concurrency < self.max_concurrency and self._successes >= self.concurrency:
+                    self.concurrency += 1
+                    self._successes = 0
+            self._condition.notify_all()
+            return False
+
+    def status_text(self) -> str:
+        with self._condition:
+            delay = self._paused_until - time.time()
+            quota = self.quotas.get("core")
+            text = f"API: {quota.remaining}/{quota.limit}" if quota else "API: ?"
+            text += f", workers: {self.concurrency}/{self.max_concurrency}"
+            if delay > 0:
+                text += f", rate limited: resuming in {delay:.0f}s"
+            return text
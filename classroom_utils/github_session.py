@@ -0,0 +1,208 @@
+# Copyright (C) 2024 twyleg
+import logging
+import threading
+import time
+
+from typing import Any, Dict, Optional, Type
+
+import requests
+import requests.adapters
+import urllib3.exceptions
+
+from github.Requester import RequestsResponse
+
+from classroom_utils import profiling
+from classroom_utils.github_cache import HttpCache
+from classroom_utils.github_metrics import RequestMetrics
+from classroom_utils.github_retry import RetryPolicy
+from classroom_utils.github_scheduler import RateLimitScheduler
+
+
+logm = logging.getLogger("github_session")
+
+
+def is_connect_error(error: requests.exceptions.RequestException) -> bool:
+    # Connection failures before the request was sent are wrapped by urllib3 in a MaxRetryError
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectTimeout) or \
+        isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+
+
+def _noop_auth(request: requests.models.PreparedRequest) -> requests.models.PreparedRequest:
+    # Having a session auth set disables the fallback to credentials from a .netrc file
+    return request
+
+
+class GithubSession:
+
+    API_URL = "https://api.github.com"
+    API_VERSION = "2022-11-28"
+
+    MAX_RATE_LIMIT_RETRIES = 5
+
+    def __init__(self, token: str, pool_size: int = 1, api_url: str = API_URL, http_cache: HttpCache | None = None,
+                 retry_policy: RetryPolicy | None = None):
+        self.api_url = api_url.rstrip("/")
+        self.http_cache = http_cache
+        self.scheduler = RateLimitScheduler(max_concurrency=pool_size)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = RequestMetrics()
+        self.pool_size = max(pool_size, requests.adapters.DEFAULT_POOLSIZE)
+
+        self.session = requests.Session()
+        self.session.auth = _noop_auth
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {token}",
+            "X-GitHub-Api-Version": self.API_VERSION,
+        })
+
+        adapter = requests.adapters.HTTPAdapter(pool_connections=requests.adapters.DEFAULT_POOLSIZE,
+                                                pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        logm.debug("Created GitHub session for '%s' with pool size %d", self.api_url, self.pool_size)
+
+    @property
+    def graphql_url(self) -> str:
+        return f"{self.api_url}/graphql"
+
+    def request(self, verb: str, url: str, **kwargs: Any) -> requests.Response:
+        if url.startswith("/"):
+            url = f"{self.api_url}{url}"
+
+        rate_limit_retries = 0
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                with self.scheduler.slot():
+                    response = self._send(verb, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                self.metrics.record(verb, url, None, time.perf_counter() - start)
+                reason = self.retry_policy.retry_reason_for_error(verb, url, request_sent=not is_connect_error(e))
+                delay = self.retry_policy.next_delay(attempt, reason) if reason else None
+                if delay is None:
+                    raise
+                logm.debug("Repeating request in %.1fs (%s, attempt %d): %s %s", delay, reason, attempt, verb, url)
+                time.sleep(delay)
+                continue
+
+            self._record_metrics(verb, url, response, time.perf_counter() - start)
+
+            text = response.text if response.status_code in (403, 429) else ""
+            if self.scheduler.update(response.status_code, response.headers, text):
+                if rate_limit_retries >= self.MAX_RATE_LIMIT_RETRIES:
+                    return response
+                rate_limit_retries += 1
+                attempt -= 1
+                logm.debug("Repeating rate limited request (%d/%d): %s %s", rate_limit_retries,
+                           self.MAX_RATE_LIMIT_RETRIES, verb, url)
+                continue
+
+            reason = self.retry_policy.retry_reason_for_status(verb, url, response.status_code)
+            delay = self.retry_policy.next_delay(attempt, reason) if reason else None
+            if delay is None:
+                return response
+            logm.debug("Repeating request in %.1fs (%s, attempt %d): %s %s", delay, reason, attempt, verb, url)
+            time.sleep(delay)
+
+    def _record_metrics(self, verb: str, url: str, response: requests.Response, latency: float) -> None:
+        request_body = response.request.body if response.request is not None else None
+        # Streamed request bodies have no known size
+        request_size = len(request_body) if isinstance(request_body, (bytes, str)) else 0
+        cached = getattr(response, "from_cache", False)
+        # Replayed responses only transferred the headers of the 304 response
+        self.metrics.record(verb, url, response.status_code, latency, request_size,
+                            0 if cached else len(response.content or b""), cached)
+
+    @profiling.timed(profiling.NETWORK_IO)
+    def _send(self, verb: str, url: str, **kwargs: Any) -> requests.Response:
+        if self.http_cache is not None and verb.upper() == "GET":
+            return self._cached_request(self.http_cache, url, **kwargs)
+        return self.session.request(verb, url, **kwargs)
+
+    def _cached_request(self, http_cache: HttpCache, url: str, headers: Optional[Dict[str, str]] = None,
+                        **kwargs: Any) -> requests.Response:
+        headers = {**self.session.headers, **(headers or {})}
+        if "If-None-Match" in headers or "If-Modified-Since" in headers:
+            return self.session.request("GET", url, headers=headers, **kwargs)
+
+        prepared_request = requests.models.PreparedRequest()
+        prepared_request.prepare_url(url, kwargs.get("params"))
+        key = HttpCache.create_key(prepared_request.url or url, headers.get("Authorization"), headers.get("Accept"))
+
+        cached_response = http_cache.get(key)
+        if cached_response is not None:
+            HttpCache.add_conditional_headers(headers, cached_response)
+
+        response = self.session.request("GET", url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and cached_response is not None:
+            logm.debug("Not modified, replaying cached response: %s", prepared_request.url)
+            http_cache.hits += 1
+            return HttpCache.replay(cached_response, response)
+
+        http_cache.misses += 1
+        if response.status_code == 200:
+            http_cache.store(key, response)
+        return response
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = self.request("GET", url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def post_json(self, url: str, body: Any) -> Any:
+        response = self.request("POST", url, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    def create_connection_class(self) -> Type["GithubSessionConnection"]:
+        return type("BoundGithubSessionConnection", (GithubSessionConnection,), {"github_session": self})
+
+    def close(self) -> None:
+        self.session.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+
+
+class GithubSessionConnection:
+    # Mimics github.Requester.HTTPSRequestsConnectionClass but sends every request through a shared GithubSession,
+    # so PyGithub reuses the pooled keep-alive connections. PyGithub might hand the same instance to several worker
+    # threads, so the state of a request is kept per thread between request() and getresponse().
+
+    github_session: GithubSession
+
+    def __init__(self, host: str, port: Optional[int] = None, strict: bool = False, timeout: Optional[int] = None,
+                 retry: Any = None, pool_size: Optional[int] = None, **kwargs: Any):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        self._pending = threading.local()
+
+    def request(self, verb: str, url: str, input: Any, headers: Dict[str, str]) -> None:
+        self._pending.request = (verb, url, input, headers)
+
+    def getresponse(self) -> RequestsResponse:
+        verb, path, input, headers = self._pending.request
+        del self._pending.request
+        api_url = requests.utils.urlparse(self.github_session.api_url)
+        port = f":{self.port}" if self.port else ""
+        url = f"{api_url.scheme}://{self.host}{port}{path}"
+        r = self.github_session.request(
+            verb,
+            url,
+            headers=headers,
+            data=input,
+            timeout=self.timeout,
+            verify=self.verify,
+            allow_redirects=False,
+        )
+        return RequestsResponse(r)
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,62 @@
+# Copyright (C) 2024 twyleg
+import hashlib
+import json
+import logging
+import threading
+
+from pathlib import Path
+from typing import Dict, Set
+
+
+logm = logging.getLogger("journal")
+
+
+class OperationJournal:
+
+    DEFAULT_DIR = Path.home() / ".classroom_utils" / "journals"
+
+    def __init__(self, operation: str, parameters: Dict[str, str | None], resume: bool = False,
+                 directory: Path = DEFAULT_DIR):
+        # Every combination of operation and parameters gets a journal of its own, so resuming never skips steps of
+        # a different run
+        parameters_hash = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.path = directory / f"{operation}_{parameters_hash}.jsonl"
+        self._lock = threading.Lock()
+        self._completed_steps: Set[str] = set()
+
+        if resume and self.path.exists():
+            self._load()
+            logm.info("Resuming from journal '%s': %d steps already completed", self.path,
+                      len(self._completed_steps))
+        elif self.path.exists():
+            self.path.unlink()
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    self._completed_steps.add(json.loads(line)["step"])
+                except (ValueError, KeyError):
+                    # The last line might be incomplete after a crash
+                    logm.debug("Ignoring invalid journal line: %s", line.strip())
+        # Rewrite the journal so new steps are never appended to an incomplete line
+        with open(self.path, "w", encoding="utf-8") as journal_file:
+            for step in sorted(self._completed_steps):
+                journal_file.write(json.dumps({"step": step}) + "\n")
+
+    def is_completed(self, step: str) -> bool:
+        with self._lock:
+            return step in self._completed_steps
+
+    def complete(self, step: str) -> None:
+        with self._lock:
+            self._completed_steps.add(step)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Appending a line per step keeps the journal consistent whenever the process is interrupted
+            with open(self.path, "a", encoding="utf-8") as journal_file:
+                journal_file.write(json.dumps({"step": step}) + "\n")
+
+    def finish(self) -> None:
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self._completed_steps.clear()
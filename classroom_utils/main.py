@@ -1,6 +1,9 @@
 # Copyright (C) 2024 twyleg
+import contextlib
+
 from classroom_utils import __version__
 from classroom_utils.cli import *
+from classroom_utils.profiling import Profiler
 
 
 logm = logging.getLogger("main")
@@ -14,6 +17,8 @@ def main() -> None:
     root_command.add_subcommand(command="github", command_type=GithubSubCommand)
     root_command.add_subcommand(command="github class")
     root_command.add_subcommand(command="github class check", command_type=GithubClassCheckSubCommand)
+    root_command.add_subcommand(command="github class plan", command_type=GithubClassPlanSubCommand)
+    root_command.add_subcommand(command="github class apply", command_type=GithubClassApplySubCommand)
     root_command.add_subcommand(command="github org", command_type=GithubOrgSubCommand)
     root_command.add_subcommand(command="github org init", command_type=GithubOrgInitSubCommand)
     root_command.add_subcommand(command="github org clone", command_type=GithubOrgCloneSubCommand)
@@ -38,10 +43,11 @@ def main() -> None:
     logm.info(__version__)
     logm.debug("Log level: %s", logging.getLevelName(log_level))
     logm.debug("Arguments: %s", args)
-    logm.debug("Command: %s", args.func.__name__)
+    logm.debug("Command: %s", args.func.__self__.__class__.__name__)
 
     try:
-        args.func(args)
+        with Profiler(args.profile) if args.profile else contextlib.nullcontext():
+            args.func(args)
     except KeyboardInterrupt:
         print()
         logging.info("Process aborted by user! Exiting...")
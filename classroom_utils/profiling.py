@@ -0,0 +1,127 @@
+# Copyright (C) 2024 twyleg
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, TextIO, TypeVar, cast
+
+
+logm = logging.getLogger("profiling")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+NETWORK_IO = "network I/O"
+JSON_SCHEMA_VALIDATION = "JSON schema validation"
+DIALOGS = "dialogs"
+PROGRESS_RENDERING = "progress rendering"
+CATEGORIES = (NETWORK_IO, JSON_SCHEMA_VALIDATION, DIALOGS, PROGRESS_RENDERING)
+
+_active_profiler: "Profiler | None" = None
+_sections = threading.local()
+
+
+@contextmanager
+def section(category: str) -> Iterator[None]:
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+
+    # Time of nested sections is subtracted from the enclosing one, e.g. network requests issued by a dialog
+    child_times: List[float] = _sections.__dict__.setdefault("child_times", [])
+    child_times.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        profiler.add_section_time(category, elapsed - child_times.pop())
+        if child_times:
+            child_times[-1] += elapsed
+
+
+def timed(category: str) -> Callable[[F], F]:
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with section(category):
+                return function(*args, **kwargs)
+        return cast(F, wrapper)
+    return decorator
+
+
+class Profiler:
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.wall_time = 0.0
+        self.section_times: Dict[str, float] = {category: 0.0 for category in CATEGORIES}
+        self._lock = threading.Lock()
+        self._profilers: List[cProfile.Profile] = []
+        self._start = 0.0
+
+    def add_section_time(self, category: str, section_time: float) -> None:
+        with self._lock:
+            self.section_times[category] += section_time
+
+    def _profile_thread(self, *args: Any) -> None:
+        # Called for the first profiling event of every new thread, enabling a profiler replaces this hook
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._profilers.append(profiler)
+        profiler.enable()
+
+    def __enter__(self) -> "Profiler":
+        global _active_profiler
+        _active_profiler = self
+        profiler = cProfile.Profile()
+        self._profilers.append(profiler)
+        # Since Python 3.12 a profiler covers all threads and enabling another one in a worker thread fails
+        if sys.version_info < (3, 12):
+            threading.setprofile(self._profile_thread)
+        self._start = time.perf_counter()
+        profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _active_profiler
+        self._profilers[0].disable()
+        self.wall_time = time.perf_counter() - self._start
+        if sys.version_info < (3, 12):
+            threading.setprofile(None)
+        _active_profiler = None
+        self.write()
+
+    def stats(self, stream: TextIO | None = None) -> pstats.Stats:
+        with self._lock:
+            return pstats.Stats(*self._profilers, stream=stream)
+
+    def write(self) -> None:
+        stats = self.stats()
+        stats.dump_stats(self.path)
+
+        logm.info("Profile written to '%s' (wall time: %.2fs)", self.path, self.wall_time)
+        logm.info("Time by category (summed over all threads):")
+        with self._lock:
+            section_times = dict(self.section_times)
+        for category, category_time in section_times.items():
+            logm.info("  %-24s %8.2fs", category, category_time)
+        logm.info("Top functions by cumulative time:")
+        for line in self._format_top_functions():
+            logm.info("  %s", line)
+
+    def _format_top_functions(self, count: int = 10) -> List[str]:
+        # Only the printed report of pstats is public API, so its table is logged without the preceding summary
+        output = io.StringIO()
+        self.stats(output).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(count)
+        lines = [line for line in output.getvalue().splitlines() if line.strip()]
+        header_index = next((index for index, line in enumerate(lines) if "ncalls" in line), len(lines))
+        return lines[header_index:]
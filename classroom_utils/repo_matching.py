@@ -0,0 +1,86 @@
+# Copyright (C) 2024 twyleg
+import logging
+
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+from github.Repository import Repository
+
+from classroom_utils.classes import Member
+
+
+logm = logging.getLogger("repo_matching")
+
+
+class PersonalRepoMatcher:
+    # Aho-Corasick automaton over the personal repo names of all members. Every repo name is scanned once, so
+    # resolving all members costs O(total length of repo names + matches) instead of O(members * repos).
+
+    def __init__(self, members: Iterable[Member]):
+        self.members_by_pattern: Dict[str, List[Member]] = {}
+        for member in members:
+            self.members_by_pattern.setdefault(member.generate_personal_repo_name(), []).append(member)
+
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[str]] = [[]]
+
+        for pattern in self.members_by_pattern:
+            self._add_pattern(pattern)
+        self._build_fail_links()
+
+    def _add_pattern(self, pattern: str) -> None:
+        state = 0
+        for char in pattern:
+            if char not in self._transitions[state]:
+                self._transitions.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._transitions[state][char] = len(self._transitions) - 1
+            state = self._transitions[state][char]
+        self._outputs[state].append(pattern)
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._transitions[state].items():
+                queue.append(next_state)
+                fail_state = self._fail[state]
+                while fail_state and char not in self._transitions[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._transitions[fail_state].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find_patterns(self, text: str) -> Set[str]:
+        patterns: Set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in self._transitions[state]:
+                state = self._fail[state]
+            state = self._transitions[state].get(char, 0)
+            patterns.update(self._outputs[state])
+        return patterns
+
+    def match_names(self, repo_names: Iterable[str]) -> Dict[Member, List[str]]:
+        matches: Dict[Member, List[str]] = {member: [] for members in self.members_by_pattern.values()
+                                            for member in members}
+        for repo_name in repo_names:
+            for pattern in self.find_patterns(repo_name.lower()):
+                for member in self.members_by_pattern[pattern]:
+                    matches[member].append(repo_name)
+
+        for pattern, members in self.members_by_pattern.items():
+            if len(members) > 1:
+                logm.warning("Ambiguous personal repo name '%s' shared by: %s", pattern,
+                             ", ".join(member.github_username for member in members))
+        for member, member_repo_names in matches.items():
+            if len(member_repo_names) > 1:
+                logm.warning("Ambiguous personal repos for '%s' ('%s'): %s", member.fullname, member.github_username,
+                             ", ".join(member_repo_names))
+        return matches
+
+    def match(self, repos: Iterable[Repository]) -> Dict[Member, List[Repository]]:
+        repos_by_name = {repo.name: repo for repo in repos}
+        return {member: [repos_by_name[repo_name] for repo_name in repo_names]
+                for member, repo_names in self.match_names(repos_by_name.keys()).items()}
@@ -2,6 +2,7 @@
 import argparse
 import logging
 import sys
+from pathlib import Path
 from typing import Dict, Union
 
 from classroom_utils import __version__
@@ -20,7 +21,7 @@ class Command:
         self.subparser = None
         self.subcommands: Dict[str, Command] = {}
         if hasattr(self, 'handle'):
-            self.parser.set_defaults(func=self.handle)
+            self.parser.set_defaults(func=self.execute)
         else:
             self.parser.set_defaults(func=self.default_handle)
 
@@ -42,6 +43,15 @@ class Command:
     def prepare_handler(self, args: argparse.Namespace) -> None:
         pass
 
+    def finish_handler(self, args: argparse.Namespace) -> None:
+        pass
+
+    def execute(self, args: argparse.Namespace) -> None:
+        try:
+            self.handle(args)
+        finally:
+            self.finish_handler(args)
+
     def default_handle(self, args: argparse.Namespace):
         logm.error("Function not yet implemented!")
 
@@ -90,6 +100,13 @@ class RootCommand(Command):
     def __init__(self):
         super().__init__(argparse.ArgumentParser(usage="classroom_utils"))
 
+        self.parser.add_argument(
+            "--profile",
+            help="Profile the command and write the pstats file to this path.",
+            type=Path,
+            default=None
+        )
+
     def handle(self, args: argparse.Namespace):
         pass
 
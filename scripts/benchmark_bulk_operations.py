@@ -0,0 +1,237 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import gc
+import json
+import logging
+import math
+import multiprocessing
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from classroom_utils.classes import Class, Classes, Member
+from classroom_utils.fake_github_server import FakeGithub, FakeGithubServer
+from classroom_utils.github_operations import GithubCredentials, GithubOperations
+
+FORMAT = "[%(asctime)s][%(levelname)s][%(name)s]: %(message)s"
+
+ORG_NAME = "benchmark-org"
+CLASS_NAME = "benchmark-class"
+TEMPLATE_REPO_FULL_NAME = f"{ORG_NAME}/template"
+SHARED_REPO_FULL_NAME = f"{ORG_NAME}/shared"
+
+DEFAULT_MEMBER_COUNTS = [10, 100, 1000, 5000]
+
+
+logm = logging.getLogger("benchmark")
+
+
+class BenchmarkGithubOperations(GithubOperations):
+    # The client side pacing of writes would dominate the wall time, only the work of the client is measured
+    CONTENT_CREATION_REQUESTS_PER_MINUTE = math.inf
+    SECONDS_BETWEEN_WRITES = None
+
+
+class BenchmarkResult(NamedTuple):
+    operation: str
+    members: int
+    requests: int
+    wall_time: float
+    peak_memory: int
+
+
+def create_members(member_count: int) -> List[Member]:
+    return [Member(name=f"Member{i}", surname="Benchmark", github_username=f"member{i:05d}", active=True)
+            for i in range(member_count)]
+
+
+def serve_fake_github(member_count: int, latency: float, rate_limit: int, api_url_queue: multiprocessing.Queue,
+                      stop_event: multiprocessing.Event) -> None:
+    # The backend runs in a process of its own, so it neither shows up in the peak memory nor competes for the GIL
+    # A second commit in every generated repo stands for the students' work, so reviews create pull requests
+    fake_github = FakeGithub(latency=latency, rate_limit=rate_limit, generated_repo_commits=2)
+    fake_github.add_org(ORG_NAME)
+    fake_github.add_repo(ORG_NAME, "template", is_template=True)
+    shared_repo = fake_github.add_repo(ORG_NAME, "shared")
+    for member in create_members(member_count):
+        fake_github.add_user(member.github_username, member.fullname)
+        fake_github.add_collaborator(shared_repo.full_name, member.github_username)
+
+    with FakeGithubServer(fake_github) as server:
+        api_url_queue.put(server.api_url)
+        stop_event.wait()
+
+
+# The operations run in this order against the same backend, e.g. reviews are created in the repos created before
+OPERATIONS: Dict[str, Callable[[GithubOperations, List[Member]], Any]] = {
+    "class_check": lambda github_ops, members: github_ops.class_check(CLASS_NAME),
+    "org_create_personal_repos": lambda github_ops, members: github_ops.org_create_personal_repos(
+        ORG_NAME, CLASS_NAME, None, TEMPLATE_REPO_FULL_NAME),
+    "org_access_grant_personal_repos": lambda github_ops, members: github_ops.org_access_grant_personal_repos(
+        ORG_NAME, members, "push"),
+    "org_reviews_create": lambda github_ops, members: github_ops.org_reviews_create(
+        ORG_NAME, CLASS_NAME, "main", "review"),
+    "repo_access_revoke_for_class": lambda github_ops, members: github_ops.repo_access_revoke_for_class(
+        SHARED_REPO_FULL_NAME, members),
+}
+
+
+def run_benchmark(member_count: int, operations: List[str], jobs: int, latency: float,
+                  rate_limit: int) -> List[BenchmarkResult]:
+    members = create_members(member_count)
+    classes = Classes()
+    classes.classes_by_name[CLASS_NAME] = Class(CLASS_NAME, members)
+
+    api_url_queue: multiprocessing.Queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    server_process = multiprocessing.Process(target=serve_fake_github,
+                                             args=(member_count, latency, rate_limit, api_url_queue, stop_event))
+    server_process.start()
+    results: List[BenchmarkResult] = []
+    try:
+        api_url = api_url_queue.get(timeout=60)
+        for operation in operations:
+            gc.collect()
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+
+            # Every operation starts with cold in-memory caches, like a separate CLI invocation with --no-cache
+            github_ops = BenchmarkGithubOperations(classes, GithubCredentials("benchmark", "token"), jobs,
+                                                   api_url=api_url)
+            OPERATIONS[operation](github_ops, members)
+
+            wall_time = time.perf_counter() - start
+            peak_memory = tracemalloc.get_traced_memory()[1] - memory_before
+            results.append(BenchmarkResult(operation, member_count, github_ops.metrics.calls, wall_time, peak_memory))
+            github_ops.github_session.close()
+            # Released before the next measurement, so its memory doesn't distort the next peak
+            del github_ops
+            logm.info("%s with %d members: %d requests, %.2fs, %.1f MiB", operation, member_count,
+                      results[-1].requests, wall_time, peak_memory / 2 ** 20)
+    finally:
+        stop_event.set()
+        server_process.join()
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> List[str]:
+    lines = [f"{'Operation':<34}  {'Members':>7}  {'Requests':>8}  {'Req/member':>10}  {'Wall s':>8}  {'Peak MiB':>8}"]
+    for result in results:
+        lines.append(f"{result.operation:<34}  {result.members:>7}  {result.requests:>8}  "
+                     f"{result.requests / result.members:>10.2f}  {result.wall_time:>8.2f}  "
+                     f"{result.peak_memory / 2 ** 20:>8.1f}")
+    return lines
+
+
+def find_regressions(results: List[BenchmarkResult], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    # Request counts are deterministic, wall time and memory are only compared with a tolerance
+    baseline_results = {(entry["operation"], entry["members"]): entry for entry in baseline}
+    regressions: List[str] = []
+    for result in results:
+        expected = baseline_results.get((result.operation, result.members))
+        if expected is None:
+            continue
+        if result.requests > expected["requests"]:
+            regressions.append(f"{result.operation} ({result.members} members): {result.requests} requests, "
+                               f"baseline {expected['requests']}")
+        for field, value_format in (("wall_time", "{:.2f}s"), ("peak_memory", "{:.0f} bytes")):
+            value, expected_value = getattr(result, field), expected[field]
+            if value > expected_value * (1.0 + tolerance):
+                regressions.append(f"{result.operation} ({result.members} members): {field} "
+                                   f"{value_format.format(value)}, baseline {value_format.format(expected_value)}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(usage="benchmark_bulk_operations [<args>]",
+                                     description="Benchmark bulk GitHub operations against a local fake GitHub API.")
+    parser.add_argument(
+        "-m",
+        "--members",
+        help=f"Class sizes to benchmark (Default: {' '.join(str(count) for count in DEFAULT_MEMBER_COUNTS)}).",
+        type=int,
+        nargs="+",
+        default=DEFAULT_MEMBER_COUNTS
+    )
+    parser.add_argument(
+        "-o",
+        "--operations",
+        help="Operations to benchmark (Default: all).",
+        choices=list(OPERATIONS),
+        nargs="+",
+        default=list(OPERATIONS)
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of parallel workers for bulk operations (Default: 4).",
+        type=int,
+        default=4
+    )
+    parser.add_argument(
+        "--latency",
+        help="Simulated latency of every API request in seconds (Default: 0).",
+        type=float,
+        default=0.0
+    )
+    parser.add_argument(
+        "--rate-limit",
+        help="Requests per hour before the fake API answers with rate limit errors (Default: unlimited).",
+        type=int,
+        default=sys.maxsize
+    )
+    parser.add_argument(
+        "--json-out",
+        help="Write the results as JSON to this file, e.g. to use it as baseline later.",
+        type=Path,
+        default=None
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Compare the results to a previous --json-out file and fail on regressions.",
+        type=Path,
+        default=None
+    )
+    parser.add_argument(
+        "--tolerance",
+        help="Allowed increase of wall time and peak memory compared to the baseline (Default: 0.25).",
+        type=float,
+        default=0.25
+    )
+    parser.add_argument(
+        "-vv",
+        "--verbose",
+        help="Run with verbose output.",
+        action='store_true',
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(stream=sys.stdout, format=FORMAT, level=logging.DEBUG if args.verbose else logging.WARNING)
+    logm.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    # The order of the operations matters, see OPERATIONS
+    selected_operations = [operation for operation in OPERATIONS if operation in args.operations]
+
+    tracemalloc.start()
+    results: List[BenchmarkResult] = []
+    for member_count in args.members:
+        results.extend(run_benchmark(member_count, selected_operations, args.jobs, args.latency, args.rate_limit))
+    tracemalloc.stop()
+
+    for line in format_results(results):
+        print(line)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as json_out_file:
+            json.dump([result._asdict() for result in results], json_out_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            logm.error("Regression: %s", regression)
+        sys.exit(1 if regressions else 0)
@@ -34,6 +34,11 @@ setup(
         "alive-progress~=3.1.5",
         "prompt-toolkit~=3.0.43",
     ],
+    extras_require={
+        "async": [
+            "aiohttp~=3.9",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "classroom_utils = classroom_utils.main:main",
@@ -0,0 +1,104 @@
+# Copyright (C) 2024 twyleg
+import asyncio
+import pytest
+
+from classroom_utils.classes import Classes, Member
+from classroom_utils.github_operations import GithubCredentials
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from classroom_utils.async_github_operations import AsyncGithubOperations
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestAsyncGithubOperations:
+
+    @staticmethod
+    def create_app(collaborators, requests):
+        async def org_repos(request):
+            requests.append(request.path)
+            return web.json_response([{"name": "max_mustermann", "full_name": "org/max_mustermann"},
+                                      {"name": "mia_musterfrau", "full_name": "org/mia_musterfrau"}])
+
+        async def collaborator(request):
+            requests.append(f"{request.method} {request.path}")
+            username = request.match_info["username"]
+            if request.method == "PUT":
+                collaborators.add(username)
+                return web.json_response({"id": 1}, status=201)
+            return web.Response(status=204 if username in collaborators else 404)
+
+        async def invitations(request):
+            requests.append(request.path)
+            return web.json_response([])
+
+        app = web.Application()
+        app.router.add_get("/orgs/org/repos", org_repos)
+        app.router.add_route("*", "/repos/org/{repo}/collaborators/{username}", collaborator)
+        app.router.add_get("/repos/org/{repo}/invitations", invitations)
+        return app
+
+    def test_OneMemberAlreadyCollaborator_GrantAccess_OnlyMissingMemberInvited(self):
+        collaborators = {"max"}
+        requests = []
+        members = [Member("Max", "Mustermann", "max", True), Member("Mia", "Musterfrau", "mia", True)]
+
+        async def run():
+            runner = web.AppRunner(self.create_app(collaborators, requests))
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                async with AsyncGithubOperations(Classes(), GithubCredentials("user", "token"),
+                                                 api_url=f"http://127.0.0.1:{port}") as github_ops:
+                    return await github_ops.org_access_grant_personal_repos("org", members, "pull")
+            finally:
+                await runner.cleanup()
+
+        failures = asyncio.run(run())
+
+        assert failures == []
+        assert collaborators == {"max", "mia"}
+        assert requests.count("PUT /repos/org/mia_musterfrau/collaborators/mia") == 1
+        assert not any(request.startswith("PUT /repos/org/max_mustermann") for request in requests)
+
+    def test_ThrottledScheduler_ParallelRequests_InFlightRequestsLimitedByConcurrency(self):
+        in_flight = []
+        violations = []
+
+        async def run():
+            github_ops = AsyncGithubOperations(Classes(), GithubCredentials("user", "token"), concurrency=8)
+
+            async def slow(request):
+                in_flight.append(request)
+                if len(in_flight) > github_ops.scheduler.concurrency:
+                    violations.append(len(in_flight))
+                await asyncio.sleep(0.05)
+                in_flight.remove(request)
+                return web.json_response({})
+
+            app = web.Application()
+            app.router.add_get("/slow", slow)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            github_ops.api_url = f"http://127.0.0.1:{port}"
+            for _ in range(2):
+                github_ops.scheduler.update(429, {"Retry-After": "0"})
+            try:
+                async with github_ops:
+                    await asyncio.gather(*(github_ops._request("GET", "/slow") for _ in range(6)))
+            finally:
+                await runner.cleanup()
+
+        asyncio.run(run())
+
+        assert violations == []
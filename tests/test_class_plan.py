@@ -0,0 +1,55 @@
+# Copyright (C) 2024 twyleg
+from types import SimpleNamespace
+
+from classroom_utils.class_plan import CANCEL_INVITATION, CREATE_REPO, INVITE, REPLACE_INVITATION, REVOKE_ACCESS, \
+    UPDATE_PERMISSION, plan_member_changes
+from classroom_utils.classes import Member
+from classroom_utils.github_graphql import UserInfo
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestPlanMemberChanges:
+
+    USER_INFO = UserInfo("max", 1, None)
+
+    @staticmethod
+    def create_member(active=True):
+        return Member(name="Max", surname="Mustermann", github_username="max", active=active)
+
+    @staticmethod
+    def create_access_snapshot(permission=None, invitation_permission=None):
+        invitation = SimpleNamespace(id=42, permissions=invitation_permission) if invitation_permission else None
+        return SimpleNamespace(
+            is_collaborator=lambda user_info: permission is not None,
+            get_permission=lambda user_info: permission,
+            get_pending_invitation=lambda user_info: invitation,
+        )
+
+    def plan(self, member, access_snapshot, permission="push"):
+        changes = plan_member_changes(member, "max_mustermann", self.USER_INFO, access_snapshot, permission)
+        return [(change.action, change.cost) for change in changes]
+
+    def test_ActiveMemberWithoutRepo_Plan_CreateAndInvite(self):
+        assert self.plan(self.create_member(), None) == [(CREATE_REPO, 1), (INVITE, 1)]
+
+    def test_ActiveMemberWithMatchingAccess_Plan_NoChanges(self):
+        assert self.plan(self.create_member(), self.create_access_snapshot(permission="write")) == []
+        assert self.plan(self.create_member(), self.create_access_snapshot(invitation_permission="write")) == []
+
+    def test_ActiveMemberWithDifferentAccess_Plan_AccessAdjusted(self):
+        assert self.plan(self.create_member(), self.create_access_snapshot()) == [(INVITE, 1)]
+        assert self.plan(self.create_member(), self.create_access_snapshot(permission="read")) == \
+               [(UPDATE_PERMISSION, 1)]
+        assert self.plan(self.create_member(), self.create_access_snapshot(invitation_permission="read")) == \
+               [(REPLACE_INVITATION, 2)]
+
+    def test_InactiveMember_Plan_AccessRemoved(self):
+        assert self.plan(self.create_member(active=False), None) == []
+        assert self.plan(self.create_member(active=False), self.create_access_snapshot(permission="write")) == \
+               [(REVOKE_ACCESS, 1)]
+        assert self.plan(self.create_member(active=False), self.create_access_snapshot(invitation_permission="read")) \
+               == [(CANCEL_INVITATION, 1)]
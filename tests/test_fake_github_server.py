@@ -0,0 +1,136 @@
+# Copyright (C) 2024 twyleg
+import functools
+import time
+
+import pytest
+
+from classroom_utils import github_operations
+from classroom_utils.classes import Class, Classes, Member
+from classroom_utils.fake_github_server import FakeGithub, FakeGithubServer
+from classroom_utils.github_operations import GithubCredentials, GithubOperations, RequestThrottle
+from classroom_utils.journal import OperationJournal
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+ORG_NAME = "org"
+CLASS_NAME = "class"
+
+
+@pytest.fixture
+def fake_github():
+    fake_github = FakeGithub()
+    fake_github.add_org(ORG_NAME)
+    fake_github.add_repo(ORG_NAME, "template", is_template=True, commits=2)
+    for github_username in ("max", "mia", "tom"):
+        fake_github.add_user(github_username)
+    return fake_github
+
+
+@pytest.fixture
+def github_ops(fake_github, monkeypatch, tmp_path):
+    monkeypatch.setattr(github_operations, "OperationJournal", functools.partial(OperationJournal, directory=tmp_path))
+    members = [Member(name=name, surname="Doe", github_username=name.lower(), active=True)
+               for name in ("Max", "Mia", "Tom")]
+    classes = Classes()
+    classes.classes_by_name[CLASS_NAME] = Class(CLASS_NAME, members)
+
+    with FakeGithubServer(fake_github) as server:
+        github_ops = GithubOperations(classes, GithubCredentials("user", "token"), jobs=2, api_url=server.api_url)
+        github_ops.content_creation_throttle = RequestThrottle(0.0)
+        yield github_ops
+        github_ops.github_session.close()
+
+
+def core_requests(github_ops):
+    # Requests counted against the core rate limit, i.e. neither GraphQL queries nor rate limit queries
+    return sum(endpoint_metrics.calls for template, endpoint_metrics in github_ops.metrics.endpoints.items()
+               if template not in ("POST /graphql", "GET /rate_limit"))
+
+
+def repo_requests(github_ops):
+    # Requests for the contents of repos, made per member
+    return sum(endpoint_metrics.calls for template, endpoint_metrics in github_ops.metrics.endpoints.items()
+               if template.split(" ")[1].startswith("/repos/{owner}/{repo}/"))
+
+
+class TestFakeGithubServer:
+
+    def test_Template_CreatePersonalRepos_ReposGeneratedWithNewRootCommit(self, fake_github, github_ops):
+        github_ops.org_create_personal_repos(ORG_NAME, CLASS_NAME, None, f"{ORG_NAME}/template")
+
+        repo = fake_github.get_repo_state(f"{ORG_NAME}/max_doe")
+        assert repo is not None
+        assert len(repo.branches["main"]) == 1
+        assert repo.branches["main"][0] not in fake_github.get_repo_state(f"{ORG_NAME}/template").branches["main"]
+        assert fake_github.get_repo_state(f"{ORG_NAME}/tom_doe") is not None
+
+    def test_OneCollaborator_GrantAccess_OthersInvitedOnce(self, fake_github, github_ops):
+        for name in ("max", "mia", "tom"):
+            fake_github.add_repo(ORG_NAME, f"{name}_doe")
+        fake_github.add_collaborator(f"{ORG_NAME}/max_doe", "max")
+        members = list(github_ops.classes.get_class(CLASS_NAME).members)
+
+        github_ops.org_access_grant_personal_repos(ORG_NAME, members, "push")
+        assert repo_requests(github_ops) <= len(members) * GithubOperations.ESTIMATED_REQUESTS_PER_ACCESS_CHANGE
+        github_ops.org_access_grant_personal_repos(ORG_NAME, members, "push")
+
+        assert not fake_github.get_repo_state(f"{ORG_NAME}/max_doe").invitations
+        assert list(fake_github.get_repo_state(f"{ORG_NAME}/mia_doe").invitations.values())[0][1] == "push"
+        assert len(fake_github.get_repo_state(f"{ORG_NAME}/tom_doe").invitations) == 1
+
+    def test_SharedRepoWithCollaborators_RevokeForClass_AccessRemoved(self, fake_github, github_ops):
+        repo = fake_github.add_repo(ORG_NAME, "shared")
+        fake_github.add_collaborator(repo.full_name, "max")
+        fake_github.add_collaborator(repo.full_name, "mia", "pull")
+
+        members = list(github_ops.classes.get_class(CLASS_NAME).members)
+
+        github_ops.repo_access_revoke_for_class(repo.full_name, members)
+
+        assert not repo.collaborators
+        assert core_requests(github_ops) <= github_ops._estimate_shared_repo_access_cost(len(members))
+
+    def test_ReposWithHistory_CreateReviews_PullRequestFromRootCommitCreated(self, fake_github, github_ops):
+        repo = fake_github.add_repo(ORG_NAME, "max_doe", commits=3)
+
+        github_ops.org_reviews_create(ORG_NAME, CLASS_NAME, "main", "review")
+
+        assert repo.branches["review"] == repo.branches["main"][:1]
+        assert [(pull["base"], pull["head"]) for pull in repo.pulls] == [("review", "main")]
+        assert repo_requests(github_ops) == GithubOperations.ESTIMATED_REQUESTS_PER_REVIEW
+
+    def test_UnknownReferenceRepo_CloneOrg_ReposClonedWithoutReference(self, fake_github, github_ops, monkeypatch,
+                                                                       tmp_path):
+        fake_github.add_repo(ORG_NAME, "max_doe")
+        reference_dirs = []
+
+        def clone_repo(clone_url, target_dir, username, token, timeout, retries, reference_dir):
+            reference_dirs.append(reference_dir)
+            return 1
+
+        monkeypatch.setattr(github_operations, "clone_repo", clone_repo)
+
+        failed_repo_names = github_ops.clone_org(ORG_NAME, tmp_path, reference_repo_full_name=f"{ORG_NAME}/unknown")
+
+        assert failed_repo_names == []
+        assert reference_dirs == [None, None]
+
+    def test_ExhaustedRateLimit_Request_PausedUntilReset(self, fake_github, github_ops):
+        fake_github.rate_limit = 1
+        fake_github.rate_limit_window = 1.0
+        github_ops.github_session.get_json(f"/orgs/{ORG_NAME}")
+
+        start = time.time()
+        github_ops.github_session.get_json(f"/orgs/{ORG_NAME}")
+
+        assert time.time() - start >= 1.0
+
+    def test_KnownAndUnknownUsers_ResolveUsers_UnknownUserMissing(self, github_ops):
+        user_infos = github_ops._resolve_users(["max", "unknown"])
+
+        assert user_infos["max"].login == "max"
+        assert user_infos["unknown"] is None
@@ -0,0 +1,167 @@
+# Copyright (C) 2024 twyleg
+import os
+import subprocess
+import sys
+
+import git
+import pytest
+
+from classroom_utils.git_operations import BackupManifest, GitCredentials, RepoCloneError, clone_repo, fetch_repo, \
+    update_object_store
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestCloneRepo:
+
+    @staticmethod
+    def create_origin(tmp_path):
+        origin_dir = tmp_path / "origin"
+        origin = git.Repo.init(origin_dir)
+        (origin_dir / "README.md").write_text("test")
+        origin.index.add(["README.md"])
+        origin.index.commit("Initial commit")
+        return origin_dir
+
+    def test_ExistingRepo_Clone_ClonedOnFirstAttempt(self, tmp_path):
+        origin_dir = self.create_origin(tmp_path)
+        target_dir = tmp_path / "backup" / "origin"
+
+        attempts = clone_repo(str(origin_dir), target_dir, "user", "token", timeout=60, retries=2)
+
+        assert attempts == 1
+        assert (target_dir / "README.md").read_text() == "test"
+
+    def test_MissingRepo_Clone_RetriedAndPartialCloneRemoved(self, tmp_path):
+        target_dir = tmp_path / "backup" / "missing"
+
+        with pytest.raises(RepoCloneError, match="after 3 attempt"):
+            clone_repo(str(tmp_path / "missing"), target_dir, "user", "token", timeout=60, retries=2)
+
+        assert not target_dir.exists()
+
+    def test_ExistingRepo_CloneWithExceededTimeout_RetriedAndFailedWithTimeout(self, tmp_path):
+        origin_dir = self.create_origin(tmp_path)
+        target_dir = tmp_path / "backup" / "origin"
+
+        with pytest.raises(RepoCloneError, match="timed out"):
+            clone_repo(str(origin_dir), target_dir, "user", "token", timeout=0.001, retries=1)
+
+        assert not target_dir.exists()
+
+    def test_Windows_CloneWithTimeout_Cloned(self, tmp_path, monkeypatch):
+        # GitPython refuses to enforce timeouts on Windows, the clone must not depend on it
+        monkeypatch.setattr(sys, "platform", "win32")
+        origin_dir = self.create_origin(tmp_path)
+        target_dir = tmp_path / "backup" / "origin"
+
+        attempts = clone_repo(str(origin_dir), target_dir, "user", "token", timeout=60)
+
+        assert attempts == 1
+        assert (target_dir / "README.md").read_text() == "test"
+
+    def test_ClonedRepo_FetchAfterNewCommit_NewCommitAvailable(self, tmp_path):
+        origin_dir = self.create_origin(tmp_path)
+        target_dir = tmp_path / "backup" / "origin"
+        clone_repo(str(origin_dir), target_dir, "user", "token")
+        origin = git.Repo(origin_dir)
+        new_commit = origin.index.commit("Second commit")
+
+        fetch_repo(target_dir, "user", "token")
+
+        assert git.Repo(target_dir).remotes.origin.refs[0].commit.hexsha == new_commit.hexsha
+
+    def test_ClonedRepo_FetchDefaultBranchAfterNewCommit_WorkingTreeUpdated(self, tmp_path):
+        origin_dir = self.create_origin(tmp_path)
+        target_dir = tmp_path / "backup" / "origin"
+        clone_repo(str(origin_dir), target_dir, "user", "token")
+        origin = git.Repo(origin_dir)
+        (origin_dir / "README.md").write_text("updated")
+        origin.index.add(["README.md"])
+        new_commit = origin.index.commit("Second commit")
+
+        fetch_repo(target_dir, "user", "token", branch=origin.active_branch.name)
+
+        assert git.Repo(target_dir).head.commit.hexsha == new_commit.hexsha
+        assert (target_dir / "README.md").read_text() == "updated"
+
+    def test_ClonedRepo_FetchAfterForcePush_WorkingTreeMatchesRewrittenHistory(self, tmp_path):
+        origin_dir = self.create_origin(tmp_path)
+        target_dir = tmp_path / "backup" / "origin"
+        clone_repo(str(origin_dir), target_dir, "user", "token")
+        origin = git.Repo(origin_dir)
+        (origin_dir / "README.md").write_text("rewritten")
+        origin.index.add(["README.md"])
+        rewritten_commit = origin.index.commit("Rewritten commit", parent_commits=[], head=True)
+
+        fetch_repo(target_dir, "user", "token", branch=origin.active_branch.name)
+
+        assert git.Repo(target_dir).head.commit.hexsha == rewritten_commit.hexsha
+        assert (target_dir / "README.md").read_text() == "rewritten"
+
+    @staticmethod
+    def local_object_shas(repo_dir):
+        packs = (repo_dir / ".git" / "objects" / "pack").glob("*.idx")
+        output = "".join(git.Git().execute(["git", "verify-pack", "-v", str(pack)]) for pack in packs)
+        return {line.split()[0] for line in output.splitlines() if line.split() and len(line.split()[0]) == 40}
+
+    def test_ObjectStore_CloneGeneratedRepoWithReference_SharedFilesNotStoredAgain(self, tmp_path):
+        template_dir = self.create_origin(tmp_path)
+        # Like generated repos on GitHub, the student repo has the template's files but a new root commit
+        generated_dir = tmp_path / "generated"
+        generated = git.Repo.init(generated_dir)
+        (generated_dir / "README.md").write_text("test")
+        (generated_dir / "solution.py").write_text("print('solution')")
+        generated.index.add(["README.md", "solution.py"])
+        generated.index.commit("Initial commit")
+        store_dir = tmp_path / "backup" / ".objects.git"
+        target_dir = tmp_path / "backup" / "generated"
+
+        update_object_store(str(template_dir), store_dir, "user", "token")
+        clone_repo(f"file://{generated_dir}", target_dir, "user", "token", reference_dir=store_dir)
+
+        alternates = (target_dir / ".git" / "objects" / "info" / "alternates").read_text()
+        assert str(store_dir / "objects") in alternates
+        local_object_shas = self.local_object_shas(target_dir)
+        assert git.Git().execute(["git", "hash-object", str(generated_dir / "README.md")]) not in local_object_shas
+        assert git.Git().execute(["git", "hash-object", str(generated_dir / "solution.py")]) in local_object_shas
+        assert (target_dir / "README.md").read_text() == "test"
+
+
+class TestBackupManifest:
+
+    def test_SavedManifest_Reload_PushedAtCompared(self, tmp_path):
+        manifest = BackupManifest(tmp_path)
+        manifest.update("repo", "2024-01-01T00:00:00+00:00")
+        manifest.save()
+
+        reloaded_manifest = BackupManifest(tmp_path)
+
+        assert reloaded_manifest.is_up_to_date("repo", "2024-01-01T00:00:00+00:00")
+        assert not reloaded_manifest.is_up_to_date("repo", "2024-01-02T00:00:00+00:00")
+        assert not reloaded_manifest.is_up_to_date("other", None)
+
+    def test_ManifestWithRepos_RemoveMissing_RemovedReposReported(self, tmp_path):
+        manifest = BackupManifest(tmp_path)
+        manifest.update("kept", None)
+        manifest.update("removed", None)
+
+        assert manifest.remove_missing(["kept", "new"]) == ["removed"]
+        assert "removed" not in manifest
+
+
+class TestGitCredentials:
+
+    def test_Credentials_CredentialFill_AnsweredFromGitProcessEnvironment(self):
+        credentials = GitCredentials("user", "secret-token")
+
+        result = subprocess.run(["git", *credentials.options(), "credential", "fill"],
+                                input="protocol=https\nhost=github.com\n\n", capture_output=True, text=True,
+                                check=True, env={**os.environ, **credentials.env()})
+
+        assert "username=user" in result.stdout
+        assert "password=secret-token" in result.stdout
+        assert "secret-token" not in os.environ.values()
@@ -0,0 +1,113 @@
+# Copyright (C) 2024 twyleg
+import requests
+
+from classroom_utils.github_cache import HttpCache
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestHttpCache:
+
+    @staticmethod
+    def create_response(body: bytes, etag: str | None = '"abc"') -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        if etag:
+            response.headers["ETag"] = etag
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    def test_EmptyCache_StoreResponseWithEtag_ResponseReplayedOnNotModified(self, tmp_path):
+        http_cache = HttpCache(tmp_path / "cache.sqlite3")
+        key = HttpCache.create_key("https://api.github.com/orgs/org/repos", "token xxx", None)
+
+        http_cache.store(key, self.create_response(b'[{"name": "repo"}]'))
+        cached_response = http_cache.get(key)
+        headers = {}
+        HttpCache.add_conditional_headers(headers, cached_response)
+
+        not_modified_response = requests.Response()
+        not_modified_response.status_code = 304
+        not_modified_response.headers["X-RateLimit-Remaining"] = "4999"
+        replayed_response = HttpCache.replay(cached_response, not_modified_response)
+
+        assert headers == {"If-None-Match": '"abc"'}
+        assert replayed_response.status_code == 200
+        assert replayed_response.json() == [{"name": "repo"}]
+        assert replayed_response.headers["X-RateLimit-Remaining"] == "4999"
+
+    def test_EmptyCache_StoreResponseWithoutValidator_NotCached(self, tmp_path):
+        http_cache = HttpCache(tmp_path / "cache.sqlite3")
+
+        http_cache.store("key", self.create_response(b"[]", etag=None))
+
+        assert http_cache.get("key") is None
+
+    def test_FullCache_StoreResponse_LeastRecentlyUsedEvicted(self, tmp_path):
+        http_cache = HttpCache(tmp_path / "cache.sqlite3", max_size=10)
+
+        http_cache.store("a", self.create_response(b"1234"))
+        http_cache.store("b", self.create_response(b"1234"))
+        http_cache.get("a")
+        http_cache.store("c", self.create_response(b"1234"))
+
+        assert http_cache.get("a") is not None
+        assert http_cache.get("b") is None
+        assert http_cache.get("c") is not None
+
+    def test_ClosedCacheWithAccessedResponse_ReopenAndStoreResponse_LeastRecentlyUsedEvicted(self, tmp_path):
+        http_cache = HttpCache(tmp_path / "cache.sqlite3", max_size=10)
+        http_cache.store("a", self.create_response(b"1234"))
+        http_cache.store("b", self.create_response(b"1234"))
+        http_cache.get("a")
+        http_cache.close()
+
+        http_cache = HttpCache(tmp_path / "cache.sqlite3", max_size=10)
+        http_cache.store("c", self.create_response(b"1234"))
+
+        assert http_cache.get("a") is not None
+        assert http_cache.get("b") is None
+
+    def test_CachedResponse_StoreSameKeyAgain_SizeNotCountedTwice(self, tmp_path):
+        http_cache = HttpCache(tmp_path / "cache.sqlite3", max_size=10)
+
+        http_cache.store("a", self.create_response(b"1234"))
+        http_cache.store("a", self.create_response(b"1234"))
+        http_cache.store("b", self.create_response(b"1234"))
+
+        assert http_cache.get("a") is not None
+        assert http_cache.get("b") is not None
+
+    def test_CacheHitInOtherInstance_StoreResponse_Stored(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(HttpCache, "LOCK_TIMEOUT", 0.1)
+        http_cache = HttpCache(tmp_path / "cache.sqlite3")
+        other_http_cache = HttpCache(tmp_path / "cache.sqlite3")
+        http_cache.store("a", self.create_response(b"1234"))
+        http_cache.get("a")
+
+        other_http_cache.store("b", self.create_response(b"1234"))
+
+        assert http_cache.get("b") is not None
+
+    def test_CacheLockedByOtherInstance_GetAndStore_TreatedAsMiss(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(HttpCache, "LOCK_TIMEOUT", 0.1)
+        http_cache = HttpCache(tmp_path / "cache.sqlite3")
+        http_cache.store("a", self.create_response(b"1234"))
+        other_http_cache = HttpCache(tmp_path / "cache.sqlite3")
+        other_http_cache._db.execute("BEGIN IMMEDIATE")
+
+        http_cache.store("b", self.create_response(b"1234"))
+
+        assert http_cache.get("a") is None
+        other_http_cache._db.rollback()
+        assert http_cache.get("a") is not None
+        assert http_cache.get("b") is None
+
+    def test_DifferentTokens_CreateKey_DifferentKeys(self):
+        url = "https://api.github.com/user/orgs"
+
+        assert HttpCache.create_key(url, "token a", None) != HttpCache.create_key(url, "token b", None)
@@ -0,0 +1,40 @@
+# Copyright (C) 2024 twyleg
+import pytest
+
+from classroom_utils.github_graphql import GithubGraphQLError, UserInfo, batched, build_users_query, \
+    parse_users_response
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestGithubGraphQL:
+
+    def test_250Logins_Batched_ThreeBatches(self):
+        logins = [f"user{i}" for i in range(250)]
+
+        assert [len(batch) for batch in batched(logins, 100)] == [100, 100, 50]
+
+    def test_Logins_BuildUsersQuery_AliasedUserFields(self):
+        query = build_users_query(["octocat", 'evil"login'])
+
+        assert 'u0: user(login: "octocat") { login databaseId name }' in query
+        assert 'u1: user(login: "evil\\"login")' in query
+
+    def test_ResponseWithUnknownUser_Parse_UnknownUserIsNone(self):
+        response = {
+            "data": {"u0": {"login": "octocat", "databaseId": 583231, "name": "The Octocat"}, "u1": None},
+            "errors": [{"type": "NOT_FOUND", "path": ["u1"], "message": "Could not resolve to a User"}],
+        }
+
+        user_infos = parse_users_response(["octocat", "void"], response)
+
+        assert user_infos == {"octocat": UserInfo("octocat", 583231, "The Octocat"), "void": None}
+
+    def test_ResponseWithRateLimitError_Parse_Raises(self):
+        response = {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}
+
+        with pytest.raises(GithubGraphQLError):
+            parse_users_response(["octocat"], response)
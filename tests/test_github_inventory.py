@@ -0,0 +1,113 @@
+# Copyright (C) 2024 twyleg
+from types import SimpleNamespace
+
+from classroom_utils.github_graphql import UserInfo
+from classroom_utils.github_inventory import OrgRepoIndex, RepoAccessSnapshot, RootCommitCache, UserCache, \
+    collaborator_permission
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestCollaboratorPermission:
+
+    @staticmethod
+    def create_permissions(**granted):
+        return SimpleNamespace(**{permission: granted.get(permission, False)
+                                  for permission in ["admin", "maintain", "push", "triage", "pull"]})
+
+    def test_Permissions_Map_LegacyPermissionNames(self):
+        assert collaborator_permission(self.create_permissions(admin=True, push=True, pull=True)) == "admin"
+        assert collaborator_permission(self.create_permissions(maintain=True, push=True, pull=True)) == "write"
+        assert collaborator_permission(self.create_permissions(triage=True, pull=True)) == "read"
+        assert collaborator_permission(self.create_permissions(pull=True)) == "read"
+        assert collaborator_permission(self.create_permissions()) == "none"
+
+
+class TestOrgRepoIndex:
+
+    @staticmethod
+    def create_org(repo_names):
+        repos = [SimpleNamespace(name=repo_name, full_name=f"org/{repo_name}") for repo_name in repo_names]
+        return SimpleNamespace(login="org", get_repos=lambda: iter(repos))
+
+    def test_OrgWithRepos_LookupByName_CaseInsensitiveMatch(self):
+        repo_index = OrgRepoIndex(self.create_org(["max_mustermann", "Template"]))
+
+        assert len(repo_index) == 2
+        assert "MAX_Mustermann" in repo_index
+        assert repo_index.get("template").full_name == "org/Template"
+        assert repo_index.get("mia_musterfrau") is None
+
+    def test_EmptyOrg_AddRepo_RepoIndexed(self):
+        repo_index = OrgRepoIndex(self.create_org([]))
+
+        repo_index.add(SimpleNamespace(name="mia_musterfrau", full_name="org/mia_musterfrau"))
+
+        assert "mia_musterfrau" in repo_index
+        assert [repo.name for repo in repo_index.repos] == ["mia_musterfrau"]
+
+
+class TestRepoAccessSnapshot:
+
+    def test_RepoWithCollaboratorAndInvitation_Snapshot_AccessResolvedByUserId(self):
+        repo = SimpleNamespace(
+            full_name="org/repo",
+            get_collaborators=lambda: [SimpleNamespace(
+                id=1, login="max", permissions=TestCollaboratorPermission.create_permissions(push=True, pull=True))],
+            get_pending_invitations=lambda: [SimpleNamespace(id=42, invitee=SimpleNamespace(id=2, login="mia"))],
+        )
+
+        access_snapshot = RepoAccessSnapshot(repo)
+
+        assert access_snapshot.is_collaborator(UserInfo("max", 1, None))
+        assert not access_snapshot.is_collaborator(UserInfo("mia", 2, None))
+        assert access_snapshot.get_pending_invitation(UserInfo("mia", 2, None)).id == 42
+        assert access_snapshot.get_pending_invitation(UserInfo("max", 1, None)) is None
+        assert access_snapshot.get_permission(UserInfo("max", 1, None)) == "write"
+        assert access_snapshot.get_permission(UserInfo("mia", 2, None)) is None
+
+
+class TestUserCache:
+
+    def test_EmptyCache_AddUser_ResolvableByLoginAndId(self):
+        user_cache = UserCache()
+
+        user_cache.add(UserInfo("OctoCat", 583231, "The Octocat"))
+
+        assert user_cache.get("octocat").database_id == 583231
+        assert user_cache.get_by_id(583231).login == "OctoCat"
+        assert user_cache.missing(["octocat", "void"]) == ["void"]
+
+    def test_PersistentCache_SaveAndReload_UsersRestored(self, tmp_path):
+        user_cache = UserCache(tmp_path / "user_cache.json")
+        user_cache.add(UserInfo("octocat", 583231, "The Octocat"))
+        user_cache.save()
+
+        reloaded_user_cache = UserCache(tmp_path / "user_cache.json")
+
+        assert reloaded_user_cache.get("octocat") == UserInfo("octocat", 583231, "The Octocat")
+
+    def test_PersistentCacheWithExpiredEntries_Reload_ExpiredUsersDropped(self, tmp_path):
+        user_cache = UserCache(tmp_path / "user_cache.json")
+        user_cache.add(UserInfo("octocat", 583231, "The Octocat"))
+        user_cache.save()
+
+        reloaded_user_cache = UserCache(tmp_path / "user_cache.json", ttl=0)
+
+        assert reloaded_user_cache.get("octocat") is None
+
+
+class TestRootCommitCache:
+
+    def test_PersistentCache_SaveAndReload_RootResolvedForSameHeadOnly(self, tmp_path):
+        root_commit_cache = RootCommitCache(tmp_path / "root_commits.json")
+        root_commit_cache.add("org/Repo", "head1", "root")
+        root_commit_cache.save()
+
+        reloaded_root_commit_cache = RootCommitCache(tmp_path / "root_commits.json")
+
+        assert reloaded_root_commit_cache.get("org/repo", "head1") == "root"
+        assert reloaded_root_commit_cache.get("org/repo", "head2") is None
@@ -0,0 +1,44 @@
+# Copyright (C) 2024 twyleg
+import json
+
+from classroom_utils.github_metrics import RequestMetrics, endpoint_template
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestEndpointTemplate:
+
+    def test_ApiUrls_Template_ParametersReplaced(self):
+        assert endpoint_template("get", "https://api.github.com/orgs/my-org/repos?per_page=100") == \
+               "GET /orgs/{org}/repos"
+        assert endpoint_template("PUT", "https://api.github.com/repos/org/repos/collaborators/max") == \
+               "PUT /repos/{owner}/{repo}/collaborators/{username}"
+        assert endpoint_template("GET", "https://api.github.com/repos/org/repo/git/refs/heads/feature/x") == \
+               "GET /repos/{owner}/{repo}/git/refs/{ref}"
+        assert endpoint_template("POST", "https://api.github.com/graphql") == "POST /graphql"
+        assert endpoint_template("GET", "https://api.github.com/user/orgs") == "GET /user/orgs"
+
+
+class TestRequestMetrics:
+
+    def test_RecordedRequests_Aggregate_CountedPerEndpoint(self, tmp_path):
+        metrics = RequestMetrics()
+
+        metrics.record("GET", "https://api.github.com/users/max", 200, 0.07, 0, 512)
+        metrics.record("GET", "https://api.github.com/users/mia", 404, 0.3, 0, 128)
+        metrics.record("GET", "https://api.github.com/users/tom", 200, 20.0, 0, 0, cached=True)
+        metrics.write_json(tmp_path / "metrics.json")
+
+        user_metrics = json.loads((tmp_path / "metrics.json").read_text())["GET /users/{username}"]
+        assert user_metrics["calls"] == 3
+        assert user_metrics["errors"] == 1
+        assert user_metrics["cached"] == 1
+        assert user_metrics["bytes_received"] == 640
+        assert user_metrics["latency_histogram"]["le_0.1"] == 1
+        assert user_metrics["latency_histogram"]["le_0.5"] == 1
+        assert user_metrics["latency_histogram"]["inf"] == 1
+        assert metrics.endpoints["GET /users/{username}"].percentile(0.5) == 0.5
+        assert len(metrics.format_table()) == 2
@@ -2,10 +2,12 @@
 import pytest
 import tempfile
 import logging
+import requests
 
 from pathlib import Path
 
-from classroom_utils.classes import Member
+from classroom_utils.classes import Classes, Member
+from classroom_utils.github_operations import GithubCredentials, GithubOperations
 
 #
 # General naming convention for unit tests:
@@ -21,4 +23,28 @@ class TestGithubOperations:
         repo_name = test_member.generate_personal_repo_name()
         assert repo_name == "muellersz_oelsen_ruedigoer_bjoern"
 
+    def test_FailingMember_RunForMembersInParallel_FailureAggregatedAndOthersProcessed(self):
+        github_ops = GithubOperations(Classes(), GithubCredentials("user", "token"), jobs=4)
+        members = [Member(name=f"Name{i}", surname="Surname", github_username=f"user{i}", active=True) for i in range(8)]
+        processed = []
 
+        def operation(member: Member) -> None:
+            if member.github_username == "user3":
+                raise RuntimeError("failed")
+            processed.append(member.github_username)
+
+        failures = github_ops._run_for_members("Test:", members, operation)
+
+        assert len(processed) == 7
+        assert len(failures) == 1
+        assert failures[0].member.github_username == "user3"
+
+    def test_RateLimitQueryFails_PreflightQuotaCheck_OperationNotStopped(self, monkeypatch):
+        github_ops = GithubOperations(Classes(), GithubCredentials("user", "token"))
+
+        def get_json(url, params=None):
+            raise requests.exceptions.HTTPError("404 Client Error: Rate limiting is not enabled.")
+
+        monkeypatch.setattr(github_ops.github_session, "get_json", get_json)
+
+        github_ops._preflight_quota_check("Creating reviews", 10)
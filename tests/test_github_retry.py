@@ -0,0 +1,90 @@
+# Copyright (C) 2024 twyleg
+import pytest
+import requests
+
+from classroom_utils.github_retry import RetryPolicy
+from classroom_utils.github_session import GithubSession
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestRetryPolicy:
+
+    def test_ServerError_RetryReason_OnlyIdempotentRequestsRetried(self):
+        retry_policy = RetryPolicy()
+
+        assert retry_policy.retry_reason_for_status("GET", "https://api.github.com/orgs/org", 502) == "HTTP 502"
+        assert retry_policy.retry_reason_for_status("POST", "https://api.github.com/graphql", 503) == "HTTP 503"
+        assert retry_policy.retry_reason_for_status("POST", "https://api.github.com/orgs/org/repos", 502) is None
+        assert retry_policy.retry_reason_for_status("GET", "https://api.github.com/orgs/org", 404) is None
+
+    def test_ConnectionError_RetryReason_UnsentPostRetried(self):
+        retry_policy = RetryPolicy()
+
+        assert retry_policy.retry_reason_for_error("POST", "https://api.github.com/orgs/org/repos", False)
+        assert retry_policy.retry_reason_for_error("POST", "https://api.github.com/orgs/org/repos", True) is None
+        assert retry_policy.retry_reason_for_error("DELETE", "https://api.github.com/repos/org/repo", True)
+
+    def test_RetriesLeft_NextDelay_JitteredBackoffUntilMaxAttempts(self):
+        retry_policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=1.5)
+
+        delays = [retry_policy.next_delay(attempt, "HTTP 502") for attempt in range(1, 4)]
+
+        assert 0.0 <= delays[0] <= 1.0
+        assert 0.0 <= delays[1] <= 1.5
+        assert delays[2] is None
+        assert retry_policy.retry_counts == {"HTTP 502": 2}
+
+
+class TestGithubSessionRetry:
+
+    @staticmethod
+    def create_response(status_code: int) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = b"{}"
+        return response
+
+    def create_session(self, monkeypatch, outcomes):
+        github_session = GithubSession("token", retry_policy=RetryPolicy(max_attempts=3, base_delay=0.0))
+        sent_requests = []
+
+        def send(verb, url, **kwargs):
+            sent_requests.append(verb)
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return self.create_response(outcome)
+
+        monkeypatch.setattr(github_session, "_send", send)
+        return github_session, sent_requests
+
+    def test_TransientFailures_Get_RetriedUntilSuccess(self, monkeypatch):
+        github_session, sent_requests = self.create_session(
+            monkeypatch, [502, requests.exceptions.ConnectionError("reset"), 200])
+
+        response = github_session.request("GET", "/orgs/org")
+
+        assert response.status_code == 200
+        assert len(sent_requests) == 3
+        assert github_session.retry_policy.retry_count == 2
+
+    def test_ServerError_Post_NotRetried(self, monkeypatch):
+        github_session, sent_requests = self.create_session(monkeypatch, [502, 201])
+
+        response = github_session.request("POST", "/orgs/org/repos")
+
+        assert response.status_code == 502
+        assert len(sent_requests) == 1
+
+    def test_PersistentConnectionError_Get_RaisedAfterMaxAttempts(self, monkeypatch):
+        github_session, sent_requests = self.create_session(
+            monkeypatch, [requests.exceptions.ConnectionError("reset")] * 3)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            github_session.request("GET", "/orgs/org")
+
+        assert len(sent_requests) == 3
@@ -0,0 +1,70 @@
+# Copyright (C) 2024 twyleg
+import time
+
+from classroom_utils.github_scheduler import RateLimitScheduler
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestRateLimitScheduler:
+
+    def test_FreshScheduler_SuccessfulResponse_QuotaTracked(self):
+        scheduler = RateLimitScheduler(max_concurrency=4)
+
+        repeat = scheduler.update(200, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4990",
+                                        "X-RateLimit-Used": "10", "X-RateLimit-Reset": "1700000000"})
+
+        assert not repeat
+        assert scheduler.quotas["core"].remaining == 4990
+        assert scheduler.pause_delay() == 0.0
+        assert scheduler.status_text() == "API: 4990/5000, workers: 4/4"
+
+    def test_FreshScheduler_SecondaryRateLimitWithRetryAfter_PausedAndConcurrencyHalved(self):
+        scheduler = RateLimitScheduler(max_concurrency=8)
+
+        repeat = scheduler.update(403, {"Retry-After": "30"}, "You have exceeded a secondary rate limit")
+
+        assert repeat
+        assert 29 < scheduler.pause_delay() <= 30
+        assert scheduler.concurrency == 4
+        assert scheduler.throttle_count == 1
+
+    def test_ExhaustedQuota_SuccessfulResponse_PausedUntilReset(self):
+        scheduler = RateLimitScheduler()
+        reset = time.time() + 120
+
+        repeat = scheduler.update(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+
+        assert not repeat
+        assert 119 < scheduler.pause_delay() <= 121
+
+    def test_ReducedConcurrency_SuccessfulResponses_ConcurrencyRecovers(self):
+        scheduler = RateLimitScheduler(max_concurrency=4)
+        scheduler.update(429, {"Retry-After": "0"})
+
+        for _ in range(2):
+            scheduler.update(200, {})
+
+        assert scheduler.concurrency == 3
+
+    def test_NotFoundResponse_Update_NotRateLimited(self):
+        scheduler = RateLimitScheduler()
+
+        assert not scheduler.update(403, {}, '{"message": "Must have admin rights to Repository."}')
+
+    def test_ResponsesAcrossWindows_QuotaUsage_UsedRequestsSummed(self):
+        scheduler = RateLimitScheduler()
+
+        def headers(used, reset):
+            return {"X-RateLimit-Remaining": str(5000 - used), "X-RateLimit-Limit": "5000",
+                    "X-RateLimit-Used": str(used), "X-RateLimit-Reset": str(reset)}
+
+        # Out of order responses of parallel requests and a window reset in between
+        for used, reset in [(11, 1000), (13, 1000), (12, 1000), (1, 2000), (2, 2000)]:
+            scheduler.update(200, headers(used, reset))
+
+        assert scheduler.quota_usage() == {"core": 5}
+        assert scheduler.quotas["core"].remaining == 4998
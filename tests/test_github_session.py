@@ -0,0 +1,51 @@
+# Copyright (C) 2024 twyleg
+import threading
+
+import github
+import requests
+
+from classroom_utils.classes import Classes
+from classroom_utils.github_operations import GithubCredentials, GithubOperations
+from classroom_utils.github_session import GithubSession
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestGithubSessionConnection:
+
+    def test_SharedConnection_InterleavedRequestsFromThreads_EveryThreadSendsItsOwnRequest(self, monkeypatch):
+        github_session = GithubSession("token")
+        sent_urls = []
+
+        def request(verb, url, **kwargs):
+            sent_urls.append(url)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b"{}"
+            return response
+
+        monkeypatch.setattr(github_session, "request", request)
+        connection = github_session.create_connection_class()("api.github.com")
+        both_requested = threading.Barrier(2)
+
+        def worker(path: str) -> None:
+            connection.request("GET", path, None, {})
+            both_requested.wait()
+            connection.getresponse()
+
+        threads = [threading.Thread(target=worker, args=(path,)) for path in ("/orgs/a", "/orgs/b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(sent_urls) == ["https://api.github.com/orgs/a", "https://api.github.com/orgs/b"]
+
+    def test_GithubOperations_Create_ConnectionClassesResetForOtherInstances(self):
+        GithubOperations(Classes(), GithubCredentials("user", "token"))
+
+        requester = github.Github()._Github__requester
+        assert requester._Requester__connectionClass is github.Requester.HTTPSRequestsConnectionClass
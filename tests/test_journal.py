@@ -0,0 +1,50 @@
+# Copyright (C) 2024 twyleg
+from classroom_utils.journal import OperationJournal
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestOperationJournal:
+
+    PARAMETERS = {"org_name": "org", "class_name": "class"}
+
+    def test_InterruptedRun_Resume_CompletedStepsSkipped(self, tmp_path):
+        journal = OperationJournal("operation", self.PARAMETERS, directory=tmp_path)
+        journal.complete("max")
+
+        resumed_journal = OperationJournal("operation", self.PARAMETERS, resume=True, directory=tmp_path)
+
+        assert resumed_journal.is_completed("max")
+        assert not resumed_journal.is_completed("mia")
+
+    def test_InterruptedRun_RunWithoutResumeOrOtherParameters_StartedFromScratch(self, tmp_path):
+        journal = OperationJournal("operation", self.PARAMETERS, directory=tmp_path)
+        journal.complete("max")
+
+        other_journal = OperationJournal("operation", {"org_name": "other"}, resume=True, directory=tmp_path)
+        fresh_journal = OperationJournal("operation", self.PARAMETERS, directory=tmp_path)
+
+        assert not other_journal.is_completed("max")
+        assert not fresh_journal.is_completed("max")
+
+    def test_JournalWithTruncatedLine_Resume_ValidStepsLoaded(self, tmp_path):
+        journal = OperationJournal("operation", self.PARAMETERS, directory=tmp_path)
+        journal.complete("max")
+        with open(journal.path, "a", encoding="utf-8") as journal_file:
+            journal_file.write('{"step": "mi')
+
+        resumed_journal = OperationJournal("operation", self.PARAMETERS, resume=True, directory=tmp_path)
+        resumed_journal.complete("mia")
+
+        assert OperationJournal("operation", self.PARAMETERS, resume=True, directory=tmp_path).is_completed("mia")
+
+    def test_CompletedRun_Finish_JournalRemoved(self, tmp_path):
+        journal = OperationJournal("operation", self.PARAMETERS, directory=tmp_path)
+        journal.complete("max")
+
+        journal.finish()
+
+        assert not journal.path.exists()
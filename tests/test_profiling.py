@@ -0,0 +1,46 @@
+# Copyright (C) 2024 twyleg
+import threading
+import time
+
+from classroom_utils import profiling
+from classroom_utils.profiling import Profiler
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestProfiler:
+
+    def test_NestedSections_Profile_ChildTimeSubtractedFromParent(self, tmp_path):
+        with Profiler(tmp_path / "profile.pstats") as profiler:
+            with profiling.section(profiling.DIALOGS):
+                time.sleep(0.02)
+                with profiling.section(profiling.NETWORK_IO):
+                    time.sleep(0.05)
+
+        assert 0.02 <= profiler.section_times[profiling.DIALOGS] < 0.05
+        assert profiler.section_times[profiling.NETWORK_IO] >= 0.05
+        assert (tmp_path / "profile.pstats").exists()
+
+    def test_NoActiveProfiler_Section_NothingRecorded(self):
+        @profiling.timed(profiling.NETWORK_IO)
+        def request():
+            return "response"
+
+        assert request() == "response"
+
+    def test_WorkerThreads_Profile_WorkersFinishAndAreProfiled(self, tmp_path):
+        def worker():
+            time.sleep(0.01)
+
+        with Profiler(tmp_path / "profile.pstats") as profiler:
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert any(function[2] == "worker" for function in profiler.stats().stats)
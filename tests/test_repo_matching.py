@@ -0,0 +1,40 @@
+# Copyright (C) 2024 twyleg
+from types import SimpleNamespace
+
+from classroom_utils.classes import Member
+from classroom_utils.repo_matching import PersonalRepoMatcher
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestPersonalRepoMatcher:
+
+    def test_PrefixedRepos_Match_MembersResolvedBySubstring(self):
+        max_member = Member(name="Max", surname="Mustermann", github_username="max", active=True)
+        mia_member = Member(name="Mia", surname="Musterfrau", github_username="mia", active=True)
+        repos = [SimpleNamespace(name=repo_name) for repo_name in
+                 ["template", "exercise_max_mustermann", "exercise_Mia_Musterfrau_v2", "other"]]
+
+        matches = PersonalRepoMatcher([max_member, mia_member]).match(repos)
+
+        assert [repo.name for repo in matches[max_member]] == ["exercise_max_mustermann"]
+        assert [repo.name for repo in matches[mia_member]] == ["exercise_Mia_Musterfrau_v2"]
+
+    def test_OverlappingNames_FindPatterns_AllPatternsFound(self):
+        members = [Member(name=name, surname="Test", github_username=name, active=True) for name in ["a", "ba", "x_a"]]
+        matcher = PersonalRepoMatcher(members)
+
+        assert matcher.find_patterns("prefix_ba_test") == {"a_test", "ba_test"}
+        assert matcher.find_patterns("x_a_test") == {"a_test", "x_a_test"}
+        assert matcher.find_patterns("unrelated") == set()
+
+    def test_MemberWithTwoRepos_Match_BothReposReportedAsAmbiguous(self, caplog):
+        member = Member(name="Max", surname="Mustermann", github_username="max", active=True)
+
+        matches = PersonalRepoMatcher([member]).match_names(["max_mustermann", "exam_max_mustermann", "mia"])
+
+        assert matches[member] == ["max_mustermann", "exam_max_mustermann"]
+        assert "Ambiguous personal repos" in caplog.text